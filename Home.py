@@ -46,20 +46,33 @@ st.header("Como utilizar o App?")
 st.subheader("Upload dos dados:")
 st.markdown("""
 - Seguir com a estrutura de dados recomendada neste repositório [Clique aqui](https://github.com/franciscobpena/medflow_project/tree/fc0885746f3df19ca2442b7aa21c09bb05e38131/dataset);
-- Os 02 arquivos templates refere-se ao tempo de atendimento e chegadas de pacientes.""")
+- Os 02 arquivos templates refere-se ao tempo de atendimento e chegadas de pacientes;
+- O tipo de cada arquivo é reconhecido pelas colunas, independente do nome do arquivo;
+- É possível enviar vários arquivos de unidades ou meses diferentes: informe a unidade de cada arquivo na barra lateral 
+(ou inclua uma coluna 'Unidade') e utilize o filtro de unidades.""")
 
 st.subheader("Visão - Entrada pacientes:")
 st.markdown("""
 - A partir do upload do arquivo template "amostra_pacientes_hora.xlsx" você terá uma série de estatisticas e projeções 
-que vão lhe auxiliar no entendimento do processo.""")
+que vão lhe auxiliar no entendimento do processo;
+- No modo de previsão hierárquica, o total, os turnos (e as horas de cada turno) são projetados juntos e reconciliados 
+(MinT ou Bottom-up), de forma que a soma dos turnos seja igual ao total.""")
 
 st.subheader("Visão - Desempenho dos processos:")
 st.markdown("""
 - A partir do upload do arquivo template "amostra_dados_tempo_ciclo.xlsx" você pode consultar uma série 
 de informações referente ao processo e seu desempenho e realizar algumas simulações; 
+- Enviando também o arquivo "amostra_pacientes_hora.xlsx", a aba de Planejamento de Capacidade projeta a utilização, 
+o tempo na fila e o headcount necessário por etapa para os próximos 30 dias, a partir da previsão de chegadas;
 - É fortemente indicado cruzar com informações factuais e contextuais para se tomar uma melhor decisão.
 """)
 
+st.subheader("Visão - Histórico:")
+st.markdown("""
+- As previsões, métricas por etapa e indicadores calculados nas outras visões são gravados em um banco local;
+- Compare a evolução entre unidades, períodos e etapas sem recalcular os modelos.
+""")
+
 st.subheader("Fundamentação técnica:")
 st.markdown("""
 - Estatística Inferencial;
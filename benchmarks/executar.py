@@ -0,0 +1,246 @@
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils import capacidade, eda, filas, ingestao, previsao, sinteticos
+
+# ===============================
+# Benchmarks dos cálculos das páginas
+# ===============================
+# Uso: python -m benchmarks.executar --linhas 10000 1000000 --unidades 4
+# Cada execução acrescenta os tempos em resultados/benchmarks.jsonl e compara
+# com a última medição registrada para o mesmo caso e escala.
+CAMINHO_RESULTADOS = os.path.join('resultados', 'benchmarks.jsonl')  # Fora do controle de versão (.gitignore)
+LIMITE_EXCEL_BENCHMARK = 100_000  # Acima disso a leitura do Excel domina o tempo da suíte
+
+
+def _como_upload(df, tipo, unidade='Unidade 001'):
+    # Mesmo estado de um arquivo recém-lido por ingestao.ler_arquivos
+    df = df.copy()
+    if ingestao.COLUNA_UNIDADE not in df.columns:
+        df[ingestao.COLUNA_UNIDADE] = unidade
+    df[ingestao.COLUNA_UNIDADE] = df[ingestao.COLUNA_UNIDADE].astype('category')
+    return ingestao.normalizar(df, tipo)
+
+
+class Cenario:
+    """Dados sintéticos de uma escala, preparados uma vez e compartilhados pelos casos."""
+
+    def __init__(self, linhas, unidades, semente=0):
+        self.linhas = linhas
+        # Escalas grandes são distribuídas em mais unidades para manter um histórico de poucos anos
+        self.unidades = max(unidades, sinteticos.unidades_necessarias(linhas))
+        self.bruto_pacientes = sinteticos.gerar_pacientes_hora(linhas, self.unidades, semente=semente)
+        self.bruto_tempo_ciclo = sinteticos.gerar_tempo_ciclo(linhas, self.unidades, semente=semente)
+
+        self.particoes_pacientes = ingestao.particionar(_como_upload(self.bruto_pacientes, 'pacientes_hora'))
+        self.particoes_tempo_ciclo = ingestao.particionar(_como_upload(self.bruto_tempo_ciclo, 'tempo_ciclo'))
+
+        datas = self.bruto_pacientes['Data']
+        self.periodo = (datas.min() + (datas.max() - datas.min()) * 0.1, datas.max())
+        self._excel = None
+
+    def excel(self):
+        # Planilhas geradas sob demanda, apenas nas escalas em que o Excel é medido
+        if self._excel is None:
+            self._excel = []
+            for nome, df in [('pacientes_hora.xlsx', self.bruto_pacientes), ('tempo_ciclo.xlsx', self.bruto_tempo_ciclo)]:
+                buffer = io.BytesIO()
+                df.to_excel(buffer, index=False)
+                self._excel.append((nome, buffer.getvalue(), None))
+        return self._excel
+
+
+# ===============================
+# Casos medidos
+# ===============================
+def caso_ingestao_excel(cenario):
+    ingestao.ler_arquivos(cenario.excel())
+
+
+def caso_normalizacao(cenario):
+    _como_upload(cenario.bruto_pacientes, 'pacientes_hora')
+    _como_upload(cenario.bruto_tempo_ciclo, 'tempo_ciclo')
+
+
+def caso_filtro(cenario):
+    inicio, fim = cenario.periodo
+    ingestao.agregar_particoes(
+        cenario.particoes_pacientes,
+        lambda particao: ingestao.filtrar_periodo(particao, inicio, fim, [1, 2, 3])
+    )
+    ingestao.agregar_particoes(
+        cenario.particoes_tempo_ciclo,
+        lambda particao: ingestao.filtrar_periodo(particao, inicio, fim)
+    )
+
+
+def caso_eda(cenario):
+    particoes = cenario.particoes_pacientes
+    ingestao.combinar_somas(
+        ingestao.agregar_particoes(particoes, eda.somar_por_hora_turno),
+        [ingestao.COLUNA_MINUTO, 'Turno'],
+        'Quantidade de Pacientes'
+    )
+    eda.estatisticas_por_turno(pd.concat(particoes.values(), ignore_index=True))
+
+
+def caso_previsao(cenario):
+    particoes = cenario.particoes_pacientes
+    df_volumetria = ingestao.combinar_somas(
+        ingestao.agregar_particoes(particoes, eda.volume_diario), ['Data'], 'Quantidade de Pacientes'
+    )
+    previsao.prever_serie(df_volumetria, 'Total')
+    df_turno = ingestao.combinar_somas(
+        ingestao.agregar_particoes(particoes, eda.volume_diario_turno), ['Data', 'Turno'], 'Quantidade de Pacientes'
+    )
+    previsao.prever_por_turno(df_turno)
+
+
+def caso_previsao_hierarquica(cenario):
+    colunas = previsao.NIVEIS_HIERARQUIA['Turno x Hora']
+    df_base = ingestao.combinar_somas(
+        ingestao.agregar_particoes(cenario.particoes_pacientes, lambda particao: eda.volume_diario_por(particao, colunas)),
+        ['Data'] + colunas, 'Quantidade de Pacientes'
+    )
+    previsao.prever_hierarquico(df_base, 'Turno x Hora', 'MinT')
+
+
+def caso_filas(cenario):
+    particoes = cenario.particoes_tempo_ciclo
+    media_tempo = eda.tempo_medio_por_etapa(ingestao.agregar_particoes(particoes, eda.somar_tempo_por_etapa))
+    etapas = media_tempo['Etapa'].tolist()
+    df_tabela = filas.calcular_tabela(etapas, media_tempo, {e: 3 for e in etapas}, {e: 6 for e in etapas})
+    tempo_total = sum(p['Tempo (Minutos)'].sum() for p in particoes.values())
+    filas.calcular_indicadores(df_tabela, tempo_total)
+
+
+def caso_capacidade(cenario):
+    particoes = cenario.particoes_pacientes
+    perfil = capacidade.perfil_horario(ingestao.combinar_somas(
+        ingestao.agregar_particoes(particoes, eda.somar_por_hora_turno),
+        [ingestao.COLUNA_MINUTO, 'Turno'], 'Quantidade de Pacientes'
+    ))
+    df_previsao = pd.DataFrame({
+        'Data': pd.date_range('2025-01-01', periods=previsao.HORIZONTE),
+        'Previsão': np.full(previsao.HORIZONTE, 24.0 * 19 * cenario.unidades),
+    })
+    media_tempo = eda.tempo_medio_por_etapa(
+        ingestao.agregar_particoes(cenario.particoes_tempo_ciclo, eda.somar_tempo_por_etapa)
+    )
+    etapas = media_tempo['Etapa'].tolist()
+    capacidade.projetar_capacidade(df_previsao, perfil, etapas, media_tempo, {e: 3 for e in etapas})
+
+
+CASOS = {
+    'ingestao_excel': caso_ingestao_excel,
+    'normalizacao': caso_normalizacao,
+    'filtro': caso_filtro,
+    'eda': caso_eda,
+    'previsao': caso_previsao,
+    'previsao_hierarquica': caso_previsao_hierarquica,
+    'filas': caso_filas,
+    'capacidade': caso_capacidade,
+}
+
+
+# ===============================
+# Execução e registro
+# ===============================
+def medir(funcao, cenario, repeticoes):
+    """Executa o caso `repeticoes` vezes (após um aquecimento) e retorna os tempos em ms."""
+    funcao(cenario)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(cenario)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def carregar_resultados(caminho=CAMINHO_RESULTADOS):
+    """Histórico de medições registradas."""
+    if not os.path.exists(caminho):
+        return pd.DataFrame()
+    return pd.read_json(caminho, lines=True)
+
+
+def executar(linhas, unidades=1, casos=None, repeticoes=5, caminho=CAMINHO_RESULTADOS):
+    """Roda os casos em cada escala, grava os resultados e retorna um DataFrame comparativo."""
+    historico = carregar_resultados(caminho)
+    ambiente = {
+        'commit': _commit_atual(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+    momento = datetime.now().isoformat(timespec='seconds')
+
+    registros = []
+    for n in linhas:
+        cenario = Cenario(n, unidades)
+        for nome in casos or CASOS:
+            if nome == 'ingestao_excel' and n > LIMITE_EXCEL_BENCHMARK:
+                continue
+            tempos = medir(CASOS[nome], cenario, repeticoes)
+            registro = {
+                'momento': momento, 'caso': nome, 'linhas': n, 'unidades': cenario.unidades,
+                'repeticoes': repeticoes, 'mediana_ms': statistics.median(tempos), 'minimo_ms': min(tempos),
+                **ambiente,
+            }
+            registros.append(registro)
+            print(f"{nome:<16} {n:>12,} linhas  mediana {registro['mediana_ms']:10.1f} ms")
+
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(caminho, 'a', encoding='utf-8') as arquivo:
+        for registro in registros:
+            arquivo.write(json.dumps(registro) + '\n')
+
+    return comparar(pd.DataFrame(registros), historico)
+
+
+def comparar(atual, historico):
+    """Junta cada medição com a última registrada anteriormente para o mesmo caso e escala."""
+    chaves = ['caso', 'linhas', 'unidades']
+    if historico.empty:
+        atual['anterior_ms'] = np.nan
+    else:
+        ultimo = historico.sort_values('momento').groupby(chaves, as_index=False).last()[chaves + ['mediana_ms']]
+        atual = atual.merge(ultimo.rename(columns={'mediana_ms': 'anterior_ms'}), on=chaves, how='left')
+    atual['variacao_%'] = (atual['mediana_ms'] / atual['anterior_ms'] - 1) * 100
+    return atual[chaves + ['mediana_ms', 'anterior_ms', 'variacao_%']]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks de ingestão, filtros, EDA, previsões, filas e capacidade.")
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="Escalas (linhas de cada conjunto sintético)")
+    parser.add_argument('--unidades', type=int, default=1, help="Quantidade de unidades (partições)")
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), help="Casos a executar (padrão: todos)")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', default=CAMINHO_RESULTADOS, help="Arquivo JSON lines com o histórico")
+    args = parser.parse_args()
+
+    resultado = executar(args.linhas, args.unidades, args.casos, args.repeticoes, args.saida)
+    print()
+    print(resultado.to_string(index=False, float_format=lambda v: f'{v:,.1f}'))
@@ -4,10 +4,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 from PIL import Image
 from statsmodels.tsa.holtwinters import ExponentialSmoothing 
-from statsmodels.tsa.arima.model import ARIMA
 import graphviz as gv
 import matplotlib.colors as mcolors
-import math
+
+from utils import armazenamento, eda, ingestao, instrumentacao, previsao
 
 # ===============================
 # Configuração da Página 
@@ -17,6 +17,9 @@ st.set_page_config(
     layout="wide"  
 )
 
+# Medição dos blocos de cálculo desta execução (painel de desempenho na barra lateral)
+rastreador = instrumentacao.iniciar('Entrada de Pacientes')
+
 # ===============================
 # Sidebar - Barra Lateral 
 # ===============================
@@ -43,16 +46,49 @@ uploaded_files = st.sidebar.file_uploader("Upload de múltiplos arquivos", accep
 if not uploaded_files:
     st.warning("Faça o upload dos templates para que os gráficos sejam gerados.")
 
-# Listar os arquivos enviados
-data_dict = {}  # Dicionário para armazenar os DataFrames
+# Ler os arquivos enviados e reconhecer o tipo de cada um pelas colunas.
+# A leitura do Excel (etapa mais cara) fica em cache apenas pelo conteúdo dos arquivos,
+# então alterar o nome de uma unidade não relê as planilhas.
+@st.cache_resource(show_spinner=False, max_entries=4)
+@instrumentacao.contar_execucao
+def ler_planilhas(planilhas):
+    return ingestao.ler_planilhas(planilhas)
+
+# As partições ficam em cache_resource (sem cópia a cada execução) e são somente leitura:
+# filtros e agregações sempre geram novos DataFrames.
+@st.cache_resource(show_spinner=False, max_entries=4)
+def carregar_dados(arquivos):
+    lidos = ler_planilhas(tuple((nome, conteudo) for nome, conteudo, _ in arquivos))
+    dados, ignorados = ingestao.consolidar(arquivos, lidos)
+    # Partições por unidade, mantidas em cache para servir o filtro de unidades
+    particoes = {tipo: ingestao.particionar(df) for tipo, df in dados.items()}
+    return particoes, ignorados
+
+# Banco local com os resultados já calculados (previsões)
+@st.cache_resource
+def abrir_armazem():
+    return armazenamento.ArmazemResultados()
+
+armazem = abrir_armazem()
+
+particoes = {}  # Dicionário {tipo: {unidade: DataFrame}}
 
 if uploaded_files:
     st.sidebar.write("Arquivos enviados:")
+    arquivos = []
     for uploaded_file in uploaded_files:
         st.sidebar.write(uploaded_file.name)
-        # Ler o arquivo e armazenar no dicionário
-        df = pd.read_excel(uploaded_file)
-        data_dict[uploaded_file.name] = df
+        unidade = st.sidebar.text_input(
+            f"Unidade do arquivo {uploaded_file.name}",
+            value=ingestao.unidade_padrao(uploaded_file.name),
+            key=f"unidade_{uploaded_file.file_id}"  # Unidades diferentes podem enviar arquivos com o mesmo nome
+        )
+        arquivos.append((uploaded_file.name, uploaded_file.getvalue(), unidade))
+
+    with rastreador.medir_cache('Leitura dos arquivos'):
+        particoes, ignorados = carregar_dados(tuple(arquivos))
+    for nome, motivo in ignorados:
+        st.sidebar.warning(f"O arquivo '{nome}' foi ignorado: {motivo}.")
 
 st.sidebar.markdown("""---""")
 
@@ -61,12 +97,21 @@ st.sidebar.markdown("""---""")
 # ===================================
 df_filtered = None  # Variável de controle para os gráficos
 
-# Verificar se o arquivo "amostra_pacientes_hora.xlsx" foi carregado
-if 'amostra_pacientes_hora.xlsx' in data_dict:
-    df_pacientes_hora = data_dict['amostra_pacientes_hora.xlsx']
+# Verificar se algum arquivo de chegada de pacientes foi carregado
+if 'pacientes_hora' in particoes:
+    unidades = list(particoes['pacientes_hora'].keys())
+
+    # Filtro interativo de Unidade (apenas quando há mais de uma)
+    if len(unidades) > 1:
+        selected_unidades = st.sidebar.multiselect('Selecione as Unidades', unidades, default=unidades)
+    else:
+        selected_unidades = unidades
 
-    # Certificar que a coluna 'Data' seja datetime
-    df_pacientes_hora['Data'] = pd.to_datetime(df_pacientes_hora['Data'], format='%Y-%m-%d')
+    particoes_selecionadas = {u: particoes['pacientes_hora'][u] for u in selected_unidades}
+    rotulo_unidades = armazenamento.rotulo_unidades(selected_unidades)
+
+if 'pacientes_hora' in particoes and particoes_selecionadas:
+    df_pacientes_hora = pd.concat(particoes_selecionadas.values(), ignore_index=True)
 
     # Definir o valor mínimo e máximo para o slider de datas
     min_date = df_pacientes_hora['Data'].min().date()  
@@ -83,16 +128,29 @@ if 'amostra_pacientes_hora.xlsx' in data_dict:
     
     # Filtro interativo de Turno com multiselect
     if 'Turno' in df_pacientes_hora.columns:
-        selected_turnos = st.sidebar.multiselect('Selecione os Turnos', df_pacientes_hora['Turno'].unique(), default=df_pacientes_hora['Turno'].unique())
+        turnos = df_pacientes_hora['Turno'].unique().tolist()
+        selected_turnos = st.sidebar.multiselect('Selecione os Turnos', turnos, default=turnos)
+
+        # Modo de previsão: ARIMA independente por série ou hierárquica reconciliada
+        modo_previsao = st.sidebar.selectbox(
+            'Modo de previsão',
+            ['Independente (ARIMA)'] + [f'Hierárquica - {nivel}' for nivel in previsao.NIVEIS_HIERARQUIA]
+        )
+        if modo_previsao.startswith('Hierárquica'):
+            metodo_reconciliacao = st.sidebar.radio('Reconciliação', previsao.METODOS_RECONCILIACAO, horizontal=True)
     
-    # Filtrar o dataframe com base nas datas e turnos selecionados
-    df_filtered = df_pacientes_hora[
-        (df_pacientes_hora['Data'].dt.date >= selected_dates[0]) & 
-        (df_pacientes_hora['Data'].dt.date <= selected_dates[1]) &
-        (df_pacientes_hora['Turno'].isin(selected_turnos))
-    ]
+    # Filtrar cada partição com base nas datas e turnos selecionados
+    def filtrar_particao(particao):
+        return ingestao.filtrar_periodo(particao, selected_dates[0], selected_dates[1], selected_turnos)
+
+    with rastreador.span('Filtro de datas e turnos'):
+        particoes_filtradas = ingestao.agregar_particoes(particoes_selecionadas, filtrar_particao)
+        df_filtered = pd.concat(particoes_filtradas.values(), ignore_index=True)
+    rastreador.contexto.update({'linhas': len(df_pacientes_hora), 'unidades': rotulo_unidades})
+elif 'pacientes_hora' in particoes:
+    st.warning("Selecione ao menos uma unidade.")
 else:
-    st.warning("O arquivo 'amostra_pacientes_hora.xlsx' não foi carregado.")
+    st.warning("Nenhum arquivo no template 'amostra_pacientes_hora.xlsx' foi carregado.")
 
 
 st.sidebar.markdown("""---""")
@@ -109,17 +167,16 @@ tab1, = st.tabs(['🚶‍➡️ Entrada de Pacientes'])
 # ============================
 # Exibindo os gráficos na Tab1
 # ============================
-if 'amostra_pacientes_hora.xlsx' in data_dict and df_filtered is not None:
+if df_filtered is not None:
     with tab1:
-        try:
-            df_filtered['Hora'] = pd.to_datetime(df_filtered['Hora'], format='%H:%M:%S')
-        except ValueError:
-            df_filtered['Hora'] = pd.to_datetime(df_filtered['Hora'], format='%H:%M')
-
-        df_filtered['Hora_Agrupada'] = df_filtered['Hora'].dt.strftime('%H:%M')
-
-        # Agrupar os dados para somar a quantidade de pacientes por hora e por turno
-        df_grouped = df_filtered.groupby(['Hora_Agrupada', 'Turno'])['Quantidade de Pacientes'].sum().reset_index()
+        # Agrupar, em paralelo por unidade, a quantidade de pacientes por hora e por turno
+        with rastreador.span('Agregação por hora e turno'):
+            df_grouped = ingestao.combinar_somas(
+                ingestao.agregar_particoes(particoes_filtradas, eda.somar_por_hora_turno),
+                [ingestao.COLUNA_MINUTO, 'Turno'],
+                'Quantidade de Pacientes'
+            )
+            df_grouped['Hora_Agrupada'] = ingestao.formatar_minutos(df_grouped[ingestao.COLUNA_MINUTO])
 
         with st.container():
             col1, col2 = st.columns(2)
@@ -159,25 +216,15 @@ if 'amostra_pacientes_hora.xlsx' in data_dict and df_filtered is not None:
         with st.container():
             st.subheader("Análise Exploratória dos Dados - EDA")
 
-            def calcular_moda(x):
-                modos = x.mode()
-                if not modos.empty:
-                    return modos.iloc[0]
-                return None
-
-            df_stats = df_filtered.groupby('Turno')['Quantidade de Pacientes'].agg(
-                Moda=calcular_moda,
-                Mediana='median',
-                Media='mean',
-                Desvio_Padrao='std'
-            ).reset_index()
-
-            df_stats_long = df_stats.melt(
-                id_vars='Turno', 
-                value_vars=['Moda', 'Mediana', 'Media', 'Desvio_Padrao'], 
-                var_name='Estatística', 
-                value_name='Valor'
-            )
+            with rastreador.span('Estatísticas EDA'):
+                df_stats = eda.estatisticas_por_turno(df_filtered)
+
+                df_stats_long = df_stats.melt(
+                    id_vars='Turno', 
+                    value_vars=['Moda', 'Mediana', 'Media', 'Desvio_Padrao'], 
+                    var_name='Estatística', 
+                    value_name='Valor'
+                )
 
             fig_stats = px.bar(
                 df_stats_long, 
@@ -195,26 +242,63 @@ if 'amostra_pacientes_hora.xlsx' in data_dict and df_filtered is not None:
             )
             st.plotly_chart(fig_stats)
 
+# ================================
+# Previsão hierárquica reconciliada (Total, Turnos e Horas)
+# ================================
+df_previsao_hierarquica = None
+if df_filtered is not None and 'Turno' in df_pacientes_hora.columns and modo_previsao.startswith('Hierárquica'):
+    nivel_hierarquia = modo_previsao.removeprefix('Hierárquica - ')
+    colunas_base = previsao.NIVEIS_HIERARQUIA[nivel_hierarquia]
+
+    # Volume diário das séries base, somado por unidade em paralelo e consolidado
+    with rastreador.span('Volume diário das séries base'):
+        df_base = ingestao.combinar_somas(
+            ingestao.agregar_particoes(
+                particoes_selecionadas,
+                lambda particao: eda.volume_diario_por(particao, colunas_base)
+            ),
+            ['Data'] + colunas_base,
+            'Quantidade de Pacientes'
+        )
+
+    # Um único ajuste em lote para todos os níveis, reconciliado para que os turnos somem o total
+    with rastreador.medir_cache('Previsão hierárquica') as contar_execucao:
+        df_previsao_hierarquica = armazem.obter_ou_calcular(
+            'previsoes',
+            armazenamento.impressao_digital(df_base, rotulo_unidades),
+            {'modelo': 'AR em lote', 'ordem': previsao.ORDEM_ARIMA, 'passos': previsao.HORIZONTE,
+             'nivel': nivel_hierarquia, 'reconciliacao': metodo_reconciliacao},
+            contar_execucao(lambda: previsao.prever_hierarquico(
+                df_base, nivel_hierarquia, metodo_reconciliacao
+            ).assign(Unidade=rotulo_unidades))
+        )
+
 # ================================
 # Previsão de Séries Temporais
 # ================================
-if 'amostra_pacientes_hora.xlsx' in data_dict:  # Verificar se o arquivo foi carregado
+if df_filtered is not None:  # Verificar se o arquivo foi carregado
     with st.container():
         if 'Data' in df_pacientes_hora.columns and 'Quantidade de Pacientes' in df_pacientes_hora.columns:
-            df_volumetria = df_pacientes_hora[['Data', 'Quantidade de Pacientes']].copy()
-            df_volumetria['Data'] = pd.to_datetime(df_volumetria['Data'], format='%Y-%m-%d')
-            df_volumetria = df_volumetria.groupby('Data').sum().reset_index()
-            df_volumetria.columns = ['ds', 'y']
-            
-            # Treinamento do modelo ARIMA
-            model = ARIMA(df_volumetria['y'], order=(5, 1, 0))  # Ajuste a ordem conforme necessário
-            model_fit = model.fit()
-
-            # Fazer previsão para os próximos 30 dias
-            forecast = model_fit.forecast(steps=30)
+            # Volume diário somado por unidade em paralelo e consolidado
+            with rastreador.span('Volume diário'):
+                df_volumetria = ingestao.combinar_somas(
+                    ingestao.agregar_particoes(particoes_selecionadas, eda.volume_diario),
+                    ['Data'],
+                    'Quantidade de Pacientes'
+                )
+                df_volumetria.columns = ['ds', 'y']
             
-            # Criar novas datas para os próximos 30 dias
-            future_dates = pd.date_range(start=df_volumetria['ds'].iloc[-1], periods=30, freq='D')
+            # Previsão ARIMA para os próximos 30 dias, reaproveitada do banco quando já calculada
+            if df_previsao_hierarquica is not None:
+                df_previsao = df_previsao_hierarquica[df_previsao_hierarquica['Nível'] == 'Total']
+            else:
+                with rastreador.medir_cache('Previsão ARIMA - Total') as contar_execucao:
+                    df_previsao = armazem.obter_ou_calcular(
+                        'previsoes',
+                        armazenamento.impressao_digital(df_volumetria, rotulo_unidades),
+                        {'modelo': 'ARIMA', 'ordem': previsao.ORDEM_ARIMA, 'passos': previsao.HORIZONTE, 'nivel': 'Total'},
+                        contar_execucao(lambda: previsao.prever_serie(df_volumetria, 'Total', coluna_data='ds', coluna_valor='y').assign(Unidade=rotulo_unidades))
+                    )
 
             # Gráfico dos dados reais e previsão
             fig_forecast = go.Figure()
@@ -224,7 +308,7 @@ if 'amostra_pacientes_hora.xlsx' in data_dict:  # Verificar se o arquivo foi car
                                               mode='lines', name='Dados Reais', line=dict(color='blue')))
 
             # Previsão
-            fig_forecast.add_trace(go.Scatter(x=future_dates, y=forecast,
+            fig_forecast.add_trace(go.Scatter(x=df_previsao['Data'], y=df_previsao['Previsão'],
                                               mode='lines', name='Previsão', line=dict(color='orange', dash='dash')))
 
             # Layout do gráfico
@@ -244,32 +328,40 @@ if 'amostra_pacientes_hora.xlsx' in data_dict:  # Verificar se o arquivo foi car
 # ======================================================
 # Previsão de Pacientes por Turno para os Próximos 30 Dias
 # ======================================================
-if 'amostra_pacientes_hora.xlsx' in data_dict:  # Verificar se o arquivo foi carregado
+if df_filtered is not None:  # Verificar se o arquivo foi carregado
     with st.container():
         if 'Turno' in df_pacientes_hora.columns:
             # Agrupar os dados por data e turno
-            df_turno = df_pacientes_hora.groupby(['Data', 'Turno'])['Quantidade de Pacientes'].sum().reset_index()
+            with rastreador.span('Volume diário por turno'):
+                df_turno = ingestao.combinar_somas(
+                    ingestao.agregar_particoes(particoes_selecionadas, eda.volume_diario_turno),
+                    ['Data', 'Turno'],
+                    'Quantidade de Pacientes'
+                )
             
             fig_forecast_turno = go.Figure()
 
-            # Treinar o modelo ARIMA para cada turno
+            # Previsão ARIMA independente para cada turno, reaproveitada do banco quando já calculada.
+            # No modo hierárquico os turnos vêm da previsão reconciliada e somam o total.
+            if df_previsao_hierarquica is not None:
+                df_previsao_turno = df_previsao_hierarquica
+            else:
+                with rastreador.medir_cache('Previsão ARIMA - Turnos') as contar_execucao:
+                    df_previsao_turno = armazem.obter_ou_calcular(
+                        'previsoes',
+                        armazenamento.impressao_digital(df_turno, rotulo_unidades),
+                        {'modelo': 'ARIMA', 'ordem': previsao.ORDEM_ARIMA, 'passos': previsao.HORIZONTE, 'nivel': 'Turno'},
+                        contar_execucao(lambda: previsao.prever_por_turno(df_turno).assign(Unidade=rotulo_unidades))
+                    )
+
             for turno in df_turno['Turno'].unique():
                 df_turno_filtrado = df_turno[df_turno['Turno'] == turno]
-                
-                # Treinamento para o modelo ARIMA por turno
-                model_turno = ARIMA(df_turno_filtrado['Quantidade de Pacientes'], order=(5, 1, 0))
-                model_fit_turno = model_turno.fit()
-
-                # Fazer previsão para os próximos 30 dias
-                forecast_turno = model_fit_turno.forecast(steps=30)
-                
-                # Criar novas datas para os próximos 30 dias
-                future_turno_dates = pd.date_range(start=df_turno_filtrado['Data'].iloc[-1], periods=30, freq='D')
+                forecast_turno = df_previsao_turno[df_previsao_turno['Nível'] == f'Turno {turno}']
 
                 # Gráfico com os dados reais e previsão por turno
                 fig_forecast_turno.add_trace(go.Scatter(x=df_turno_filtrado['Data'], y=df_turno_filtrado['Quantidade de Pacientes'],
                                                         mode='lines', name=f'Dados Reais Turno {turno}', line=dict(color='blue')))
-                fig_forecast_turno.add_trace(go.Scatter(x=future_turno_dates, y=forecast_turno,
+                fig_forecast_turno.add_trace(go.Scatter(x=forecast_turno['Data'], y=forecast_turno['Previsão'],
                                                         mode='lines', name=f'Previsão Turno {turno}', line=dict(dash='dash')))
 
             # Layout do gráfico
@@ -286,6 +378,11 @@ if 'amostra_pacientes_hora.xlsx' in data_dict:  # Verificar se o arquivo foi car
         else:
             st.warning("Os dados não contêm a coluna 'Turno'.")
 
+# ======================================================
+# Painel de desempenho (opcional)
+# ======================================================
+instrumentacao.exibir_painel(rastreador)
+
 # ======================================================
 # Rodapé
 # ======================================================
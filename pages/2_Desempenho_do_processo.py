@@ -5,7 +5,8 @@ import plotly.graph_objects as go
 from PIL import Image
 import graphviz as gv
 import matplotlib.colors as mcolors
-import math
+
+from utils import armazenamento, capacidade, eda, filas, ingestao, instrumentacao, previsao
 
 # ===============================
 # Configuração da Página 
@@ -15,6 +16,9 @@ st.set_page_config(
     layout="wide"  
 )
 
+# Medição dos blocos de cálculo desta execução (painel de desempenho na barra lateral)
+rastreador = instrumentacao.iniciar('Desempenho do Processo')
+
 # ===============================
 # Sidebar - Barra Lateral 
 # ===============================
@@ -41,27 +45,77 @@ uploaded_files = st.sidebar.file_uploader("Upload de múltiplos arquivos", accep
 if not uploaded_files:
     st.warning("Faça o upload dos templates para que os gráficos sejam gerados.")
 
-# Listar os arquivos enviados
-data_dict = {}  # Dicionário para armazenar os DataFrames
+# Ler os arquivos enviados e reconhecer o tipo de cada um pelas colunas.
+# A leitura do Excel (etapa mais cara) fica em cache apenas pelo conteúdo dos arquivos,
+# então alterar o nome de uma unidade não relê as planilhas.
+@st.cache_resource(show_spinner=False, max_entries=4)
+@instrumentacao.contar_execucao
+def ler_planilhas(planilhas):
+    return ingestao.ler_planilhas(planilhas)
+
+# As partições ficam em cache_resource (sem cópia a cada execução) e são somente leitura:
+# filtros e agregações sempre geram novos DataFrames.
+@st.cache_resource(show_spinner=False, max_entries=4)
+def carregar_dados(arquivos):
+    lidos = ler_planilhas(tuple((nome, conteudo) for nome, conteudo, _ in arquivos))
+    dados, ignorados = ingestao.consolidar(arquivos, lidos)
+    # Partições por unidade, mantidas em cache para servir o filtro de unidades
+    particoes = {tipo: ingestao.particionar(df) for tipo, df in dados.items()}
+    return particoes, ignorados
+
+# Banco local com os resultados já calculados (métricas por etapa e indicadores)
+@st.cache_resource
+def abrir_armazem():
+    return armazenamento.ArmazemResultados()
+
+armazem = abrir_armazem()
+
+# Projeção de capacidade para os dias previstos, em cache pelas impressões digitais da previsão e dos parâmetros
+@st.cache_data(show_spinner=False)
+@instrumentacao.contar_execucao
+def projetar_capacidade(fingerprint_previsao, fingerprint_parametros, _df_previsao, _perfil, _etapas, _media_tempo, _headcount_etapas, _utilizacao_alvo):
+    return capacidade.projetar_capacidade(_df_previsao, _perfil, _etapas, _media_tempo, _headcount_etapas, _utilizacao_alvo)
+
+particoes = {}  # Dicionário {tipo: {unidade: DataFrame}}
+
 if uploaded_files:
     st.sidebar.write("Arquivos enviados:")
+    arquivos = []
     for uploaded_file in uploaded_files:
         st.sidebar.write(uploaded_file.name)
-        df = pd.read_excel(uploaded_file)
-        data_dict[uploaded_file.name] = df
+        unidade = st.sidebar.text_input(
+            f"Unidade do arquivo {uploaded_file.name}",
+            value=ingestao.unidade_padrao(uploaded_file.name),
+            key=f"unidade_{uploaded_file.file_id}"  # Unidades diferentes podem enviar arquivos com o mesmo nome
+        )
+        arquivos.append((uploaded_file.name, uploaded_file.getvalue(), unidade))
+
+    with rastreador.medir_cache('Leitura dos arquivos'):
+        particoes, ignorados = carregar_dados(tuple(arquivos))
+    for nome, motivo in ignorados:
+        st.sidebar.warning(f"O arquivo '{nome}' foi ignorado: {motivo}.")
 
 st.sidebar.markdown("""---""")
 
 # ===================================
-# Filtro interativo de datas para o arquivo amostra_dados_tempo_ciclo.xlsx
+# Filtros interativos para os arquivos de tempo de ciclo
 # ===================================
 df_filtered = None  # Variável de controle para os gráficos
 
-if 'amostra_dados_tempo_ciclo.xlsx' in data_dict:
-    df_tempo_ciclo = data_dict['amostra_dados_tempo_ciclo.xlsx']
+if 'tempo_ciclo' in particoes:
+    unidades = list(particoes['tempo_ciclo'].keys())
 
-    # Certificar que a coluna 'Data' seja datetime
-    df_tempo_ciclo['Data'] = pd.to_datetime(df_tempo_ciclo['Data'], format='%Y-%m-%d')
+    # Filtro interativo de Unidade (apenas quando há mais de uma)
+    if len(unidades) > 1:
+        selected_unidades = st.sidebar.multiselect('Selecione as Unidades', unidades, default=unidades)
+    else:
+        selected_unidades = unidades
+
+    particoes_selecionadas = {u: particoes['tempo_ciclo'][u] for u in selected_unidades}
+    rotulo_unidades = armazenamento.rotulo_unidades(selected_unidades)
+
+if 'tempo_ciclo' in particoes and particoes_selecionadas:
+    df_tempo_ciclo = pd.concat(particoes_selecionadas.values(), ignore_index=True)
 
     # Definir o valor mínimo e máximo para o slider de datas
     min_date = df_tempo_ciclo['Data'].min().date()  
@@ -76,11 +130,23 @@ if 'amostra_dados_tempo_ciclo.xlsx' in data_dict:
         format='DD-MM-YYYY'
     )
 
-    # Filtrar o dataframe com base nas datas selecionadas
-    df_filtered = df_tempo_ciclo[(df_tempo_ciclo['Data'].dt.date >= selected_dates[0]) & 
-                                 (df_tempo_ciclo['Data'].dt.date <= selected_dates[1])]
+    # Filtrar cada partição com base nas datas selecionadas
+    def filtrar_particao(particao):
+        return ingestao.filtrar_periodo(particao, selected_dates[0], selected_dates[1])
 
-st.sidebar.markdown("""---""")
+    with rastreador.span('Filtro de datas'):
+        particoes_filtradas = ingestao.agregar_particoes(particoes_selecionadas, filtrar_particao)
+        df_filtered = pd.concat(particoes_filtradas.values(), ignore_index=True)
+    rastreador.contexto.update({'linhas': len(df_tempo_ciclo), 'unidades': rotulo_unidades})
+
+    # Soma e contagem do tempo por etapa em cada unidade, consolidadas na média geral
+    with rastreador.span('Tempo médio por etapa'):
+        parciais_etapa = ingestao.agregar_particoes(particoes_filtradas, eda.somar_tempo_por_etapa)
+        media_tempo = eda.tempo_medio_por_etapa(parciais_etapa)
+
+    # Impressão digital dos dados filtrados, chave dos resultados gravados no banco
+    fingerprint_dados = armazenamento.impressao_digital(df_filtered, rotulo_unidades)
+    periodo = {'Unidade': rotulo_unidades, 'Data Inicial': pd.Timestamp(selected_dates[0]), 'Data Final': pd.Timestamp(selected_dates[1])}
 
 st.sidebar.markdown('##### Desenvolvido por [@FranciscoPena](https://www.linkedin.com/in/franciscobpena/) & [@DanielMeireles](https://www.linkedin.com/in/daniel-meireles-processos/) 🤓')
 
@@ -90,7 +156,7 @@ st.sidebar.markdown('##### Desenvolvido por [@FranciscoPena](https://www.linkedi
 st.header("🏥Visão Analítica por:")
 
 # Criando as guias (tabs)
-tab2, tab3 = st.tabs(['🔜 Etapas do Processo', '📊 Gráficos Complementares'])
+tab2, tab3, tab4 = st.tabs(['🔜 Etapas do Processo', '📊 Gráficos Complementares', '📅 Planejamento de Capacidade'])
 
 # =====================================================
 # Exibindo os gráficos na Tab2 - Etapas do Atendimento
@@ -110,7 +176,6 @@ if df_filtered is not None:
             fig_box = px.box(df_filtered, x='Etapa', y='Tempo (Minutos)', title="Boxplot: Tempo por Etapa")
 
             # Adicionar linha de média
-            media_tempo = df_filtered.groupby('Etapa')['Tempo (Minutos)'].mean().reset_index()
 
             for index, row in media_tempo.iterrows():
                 fig_box.add_trace(go.Scatter(
@@ -132,9 +197,6 @@ if df_filtered is not None:
             # Subtítulo para a sequência
             st.write("### Definir a sequência do processo")
         
-            # Agrupar as etapas e calcular a média do Tempo (Minutos)
-            media_tempo = df_filtered.groupby('Etapa')['Tempo (Minutos)'].mean().reset_index()
-        
             # Interações para a sequência das etapas
             etapas = media_tempo['Etapa'].unique().tolist()
         
@@ -158,24 +220,25 @@ if df_filtered is not None:
         
                 # Criar o diagrama de fluxo horizontal com gradação de cor para TC
                 st.subheader("Diagrama de Fluxo com Headcount e Mapa de Calor por TC")
-                dot = gv.Digraph(format='png')
-                dot.attr(rankdir='LR')  # Define a orientação horizontal (Left to Right)
-        
-                # Mapear as cores para os tempos de ciclo (TC)
-                norm = mcolors.Normalize(vmin=media_tempo['Tempo (Minutos)'].min(), vmax=media_tempo['Tempo (Minutos)'].max())
-                cmap = mcolors.LinearSegmentedColormap.from_list("", ["#FFCCCC", "#FF0000"])  # De gradiente claro até vermelho
-        
-                # Adicionar as etapas, tempo de ciclo (TC), e Headcount ao diagrama
-                for i, (etapa, pos) in enumerate(etapas_ordenadas):
-                    tc = media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0]
-                    headcount = headcount_etapas[etapa]
-                    color = mcolors.to_hex(cmap(norm(tc)))  # Mapeia a cor baseada no valor de TC
-                    dot.node(etapa, f"{etapa}\nTC: {tc:.2f} min\nHeadcount: {headcount}", style='filled', fillcolor=color)
-                    if i > 0:
-                        dot.edge(etapas_ordenadas[i-1][0], etapa)
-        
-                # Renderizar o diagrama
-                st.graphviz_chart(dot)
+                with rastreador.span('Diagrama de fluxo (TC)'):
+                    dot = gv.Digraph(format='png')
+                    dot.attr(rankdir='LR')  # Define a orientação horizontal (Left to Right)
+        
+                    # Mapear as cores para os tempos de ciclo (TC)
+                    norm = mcolors.Normalize(vmin=media_tempo['Tempo (Minutos)'].min(), vmax=media_tempo['Tempo (Minutos)'].max())
+                    cmap = mcolors.LinearSegmentedColormap.from_list("", ["#FFCCCC", "#FF0000"])  # De gradiente claro até vermelho
+        
+                    # Adicionar as etapas, tempo de ciclo (TC), e Headcount ao diagrama
+                    for i, (etapa, pos) in enumerate(etapas_ordenadas):
+                        tc = media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0]
+                        headcount = headcount_etapas[etapa]
+                        color = mcolors.to_hex(cmap(norm(tc)))  # Mapeia a cor baseada no valor de TC
+                        dot.node(etapa, f"{etapa}\nTC: {tc:.2f} min\nHeadcount: {headcount}", style='filled', fillcolor=color)
+                        if i > 0:
+                            dot.edge(etapas_ordenadas[i-1][0], etapa)
+        
+                    # Renderizar o diagrama
+                    st.graphviz_chart(dot)
 
 # ======================================================
 # Container 3: Taxa de Chegada de Pacientes por Etapa
@@ -199,31 +262,38 @@ if df_filtered is not None:
             # ======================================================
             # Justification for the chosen model in each stage
             st.write("### Modelos Utilizados:")
-            st.write("""
+            st.write(f"""
             - Etapas com apenas 1 funcionário seguiram o modelo M/M/1.
             - Etapas com mais de um funcionário seguiram o modelo M/M/c, considerando múltiplos servidores.
+            - O Headcount Necessário é o menor que mantém a utilização em até {filas.UTILIZACAO_ALVO:.0%}, o mesmo critério do planejamento de capacidade.
             """)
         
             # Organizar as colunas da tabela de acordo com a sequência das etapas do Container 2
             colunas = [etapa[0] for etapa in etapas_ordenadas]
         
-                        # Estruturar uma tabela interativa com as variáveis calculadas
-            df_tabela = pd.DataFrame({
-                'Etapa': colunas,  # Use a ordem das etapas definida pelo usuário
-                'Headcount': [headcount_etapas[etapa] for etapa in colunas],
-                'Headcount Necessário': [math.ceil(media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0] / (60 / taxa_chegada_etapas[etapa])) for etapa in colunas],
-                'TCC': [taxa_chegada_etapas[etapa] for etapa in colunas],
-                'TAF': [headcount_etapas[etapa] / media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0] * 60 for etapa in colunas],
-                'Fator de Utilização (%)': [round((taxa_chegada_etapas[etapa] / (headcount_etapas[etapa] / media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0] * 60) * 100), 2) for etapa in colunas],
-                'Clientes na Fila': [(taxa_chegada_etapas[etapa] / (headcount_etapas[etapa] / media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0] * 60)) * (taxa_chegada_etapas[etapa] / ((headcount_etapas[etapa] / media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0] * 60) - taxa_chegada_etapas[etapa])) for etapa in colunas],
-                'Tempo na Fila (h)': [(taxa_chegada_etapas[etapa] / (headcount_etapas[etapa] / media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0] * 60)) * (1 / ((headcount_etapas[etapa] / media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0] * 60) - taxa_chegada_etapas[etapa])) for etapa in colunas],
-                'Tempo na Fila (min)': [(taxa_chegada_etapas[etapa] / (headcount_etapas[etapa] / media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0] * 60)) * 60 for etapa in colunas],
-            })
-        
-            df_tabela['Etapa'] = df_tabela['Etapa'].astype(str)  # Converter para string se necessário
-        
-            # Aplicar o estilo com gradiente de cor para Fator de Utilização e Clientes na Fila em vermelho
-            styled_df = df_tabela.style.background_gradient(subset=['Fator de Utilização (%)', 'Clientes na Fila'], cmap="Reds")
+            # Estruturar uma tabela interativa com as variáveis calculadas, reaproveitada do banco quando já calculada
+            parametros_processo = {'sequencia': colunas, 'headcount': headcount_etapas, 'tcc': taxa_chegada_etapas}
+            with rastreador.medir_cache('Tabela de desempenho (df_tabela)') as contar_execucao:
+                df_metricas = armazem.obter_ou_calcular(
+                    'metricas_etapa',
+                    fingerprint_dados,
+                    parametros_processo,
+                    contar_execucao(lambda: filas.calcular_tabela(colunas, media_tempo, headcount_etapas, taxa_chegada_etapas).assign(**periodo))
+                )
+            df_tabela = df_metricas.drop(columns=list(periodo))
+        
+            # Aplicar o estilo com gradiente de cor para Fator de Utilização e Clientes na Fila em vermelho.
+            # Etapas sobrecarregadas têm fila infinita: no gradiente recebem a cor do maior valor finito
+            fila_infinita = df_tabela['Clientes na Fila'] == float('inf')
+            teto_fila = df_tabela.loc[~fila_infinita, 'Clientes na Fila'].max()
+            styled_df = (
+                df_tabela.style
+                .background_gradient(subset=['Fator de Utilização (%)'], cmap="Reds")
+                .background_gradient(
+                    subset=['Clientes na Fila'], cmap="Reds",
+                    gmap=df_tabela['Clientes na Fila'].clip(upper=teto_fila if pd.notna(teto_fila) else 1.0)
+                )
+            )
             st.dataframe(styled_df)
         
             # Analyze the performance dynamically based on Fator de Utilização
@@ -252,36 +322,37 @@ if df_filtered is not None:
             st.subheader("Diagrama de Fluxo")
         
             # Criar o diagrama de fluxo horizontal com tempos na fila entre etapas
-            dot = gv.Digraph(format='png')
-            dot.attr(rankdir='LR')  # Define a orientação horizontal (Left to Right)
+            with rastreador.span('Diagrama de fluxo (fila)'):
+                dot = gv.Digraph(format='png')
+                dot.attr(rankdir='LR')  # Define a orientação horizontal (Left to Right)
         
-            # Mapear as cores para o tempo de fila (min) para os quadrados
-            norm = mcolors.Normalize(vmin=df_tabela['Tempo na Fila (min)'].min(), vmax=df_tabela['Tempo na Fila (min)'].max())
-            cmap = mcolors.LinearSegmentedColormap.from_list("", ["#FFCCCC", "#FF0000"])  # Gradiente vermelho para quadrados
+                # Mapear as cores para o tempo de fila (min) para os quadrados
+                norm = mcolors.Normalize(vmin=df_tabela['Tempo na Fila (min)'].min(), vmax=df_tabela['Tempo na Fila (min)'].max())
+                cmap = mcolors.LinearSegmentedColormap.from_list("", ["#FFCCCC", "#FF0000"])  # Gradiente vermelho para quadrados
         
-            # Adicionar as etapas e o tempo de ciclo (TC) ao diagrama, destacando gargalos
-            for i, (etapa, pos) in enumerate(etapas_ordenadas):
-                tc = media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0]
-                tempo_fila = df_tabela[df_tabela['Etapa'] == etapa]['Tempo na Fila (min)'].values[0]
+                # Adicionar as etapas e o tempo de ciclo (TC) ao diagrama, destacando gargalos
+                for i, (etapa, pos) in enumerate(etapas_ordenadas):
+                    tc = media_tempo[media_tempo['Etapa'] == etapa]['Tempo (Minutos)'].values[0]
+                    tempo_fila = df_tabela[df_tabela['Etapa'] == etapa]['Tempo na Fila (min)'].values[0]
                 
-                # Nome da etapa com TC (sem mapa de calor)
-                dot.node(etapa, f"TC: {tc:.2f} min\n{etapa}", style='filled', fillcolor='white', fontsize="16", fontname="Helvetica-Bold")
+                    # Nome da etapa com TC (sem mapa de calor)
+                    dot.node(etapa, f"TC: {tc:.2f} min\n{etapa}", style='filled', fillcolor='white', fontsize="16", fontname="Helvetica-Bold")
         
-                # Se não for a primeira etapa, adiciona o tempo de fila entre as etapas em um quadrado
-                if i > 0:
-                    etapa_anterior = etapas_ordenadas[i-1][0]
-                    # Adicionar o tempo de fila entre as etapas em um quadrado, com mapa de calor
-                    color = mcolors.to_hex(cmap(norm(tempo_fila)))
-                    dot.node(f"fila_{i}", f"TE: {tempo_fila:.2f} min", shape='box', style='filled', fillcolor=color, fontsize="16", fontname="Helvetica-Bold")
-                    dot.edge(etapa_anterior, f"fila_{i}")
-                    dot.edge(f"fila_{i}", etapa)
+                    # Se não for a primeira etapa, adiciona o tempo de fila entre as etapas em um quadrado
+                    if i > 0:
+                        etapa_anterior = etapas_ordenadas[i-1][0]
+                        # Adicionar o tempo de fila entre as etapas em um quadrado, com mapa de calor
+                        color = mcolors.to_hex(cmap(norm(tempo_fila)))
+                        dot.node(f"fila_{i}", f"TE: {tempo_fila:.2f} min", shape='box', style='filled', fillcolor=color, fontsize="16", fontname="Helvetica-Bold")
+                        dot.edge(etapa_anterior, f"fila_{i}")
+                        dot.edge(f"fila_{i}", etapa)
         
-            # Identificar e marcar o gargalo com a menor TAF (etapa roxa com texto "Gargalo")
-            gargalo = df_tabela.loc[df_tabela['TAF'].idxmin()]
-            dot.node(gargalo['Etapa'], f"{gargalo['Etapa']}\n(Gargalo)\nMenor TAF: {gargalo['TAF']:.2f} Pctes/h", style='filled', fillcolor='purple', fontsize="16", fontname="Helvetica-Bold")
+                # Identificar e marcar o gargalo com a menor TAF (etapa roxa com texto "Gargalo")
+                gargalo = df_tabela.loc[df_tabela['TAF'].idxmin()]
+                dot.node(gargalo['Etapa'], f"{gargalo['Etapa']}\n(Gargalo)\nMenor TAF: {gargalo['TAF']:.2f} Pctes/h", style='filled', fillcolor='purple', fontsize="16", fontname="Helvetica-Bold")
         
-            # Renderizar o diagrama
-            st.graphviz_chart(dot)
+                # Renderizar o diagrama
+                st.graphviz_chart(dot)
 
 else:
     st.warning("Você deve inserir os dados de acordo com o template 'amostra_dados_tempo_ciclo.xlsx' para visualizar os gráficos.")
@@ -301,8 +372,16 @@ if df_filtered is not None:
             # Coluna 1: Leadtime em Minutos
             # =======================
             with col1:               
-                # Somar todos os tempos de ciclo (TC) e tempos na fila (TE)
-                leadtime_minutos = df_filtered['Tempo (Minutos)'].sum() + df_tabela['Tempo na Fila (min)'].sum()
+                # Somar todos os tempos de ciclo (TC) e tempos na fila (TE), reaproveitando o banco quando já calculado
+                with rastreador.medir_cache('Indicadores (leadtime e TAV)') as contar_execucao:
+                    df_indicadores = armazem.obter_ou_calcular(
+                        'indicadores',
+                        fingerprint_dados,
+                        parametros_processo,
+                        contar_execucao(lambda: pd.DataFrame([filas.calcular_indicadores(df_tabela, df_filtered['Tempo (Minutos)'].sum())]).assign(**periodo))
+                    )
+                indicadores = df_indicadores.iloc[0]
+                leadtime_minutos = indicadores['Leadtime (min)']
 
                 # Exibir resultado em minutos
                 st.metric(label="Leadtime (Minutos)", value=f"{leadtime_minutos:.2f} min")
@@ -311,11 +390,8 @@ if df_filtered is not None:
             # Coluna 2: Saídas por hora
             # =======================
             with col2: 
-                # Calcular a menor TAF do processo
-                menor_taf = df_tabela['TAF'].min()
-                
-                # Calcular saídas com base na menor TAF
-                saida_por_hora = 1 / menor_taf if menor_taf > 0 else 0
+                # Saídas com base na menor TAF
+                saida_por_hora = indicadores['Saídas (Pacientes/h)']
 
                 # Exibir o valor das saídas
                 st.metric(label="Saídas (Paciente/hora)", value=f"{saida_por_hora:.2f} Pacientes/h")
@@ -328,14 +404,11 @@ if df_filtered is not None:
 # ======================================================
         with st.container():
         
-            # Calcular o Tempo Não Agregado de Valor (NAV) e Agregado de Valor (AV)
-            NAV = df_tabela['Tempo na Fila (min)'].sum()  # Tempo Não Agregado de Valor
-            AV = df_filtered['Tempo (Minutos)'].sum()     # Tempo Agregado de Valor
-        
-            # Calcular o Total do Leadtime e proporção TAV e TNAV
-            leadtime_minutos = AV + NAV
-            TAV_percent = (AV / leadtime_minutos) * 100 if leadtime_minutos > 0 else 0
-            TNAV_percent = 100 - TAV_percent
+            # Tempo Não Agregado de Valor (NAV), Agregado de Valor (AV) e proporção TAV e TNAV
+            NAV = indicadores['TNAV (min)']
+            AV = indicadores['TAV (min)']
+            TAV_percent = indicadores['TAV (%)']
+            TNAV_percent = indicadores['TNAV (%)']
         
             # Criar DataFrame para o Mapa de Árvore
             df_treemap = pd.DataFrame({
@@ -425,6 +498,117 @@ if df_filtered is not None:
             # Exibir o gráfico
             st.plotly_chart(fig_utilizacao, use_container_width=True)
 
+# =====================================================
+# Tab 4 - Planejamento de Capacidade (previsão de chegadas)
+# =====================================================
+if df_filtered is not None:
+    with tab4:
+        st.subheader("Capacidade Projetada para os Próximos 30 Dias")
+
+        if 'pacientes_hora' in particoes:
+            # Unidades de chegada correspondentes às unidades de tempo de ciclo selecionadas.
+            # Por padrão, as de mesmo nome; com uma única unidade de cada lado (ex.: os dois templates,
+            # cujos nomes vêm dos arquivos), elas são pareadas. Nos demais casos o planejador escolhe.
+            unidades_chegada = list(particoes['pacientes_hora'].keys())
+            padrao_chegada = [u for u in unidades_chegada if u in selected_unidades]
+            if not padrao_chegada and len(unidades_chegada) == 1 and len(selected_unidades) == 1:
+                padrao_chegada = unidades_chegada
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                selected_chegada = st.multiselect('Unidades das chegadas', unidades_chegada, default=padrao_chegada)
+            with col2:
+                utilizacao_alvo = st.number_input(
+                    'Utilização alvo (%)', min_value=50, max_value=99, value=int(filas.UTILIZACAO_ALVO * 100)
+                ) / 100
+
+        if 'pacientes_hora' in particoes and not selected_chegada:
+            st.warning(
+                f"Nenhuma unidade de chegada corresponde a {rotulo_unidades}. "
+                "Selecione acima as unidades de chegada que abastecem estas etapas."
+            )
+        elif 'pacientes_hora' in particoes:
+            particoes_chegada = {u: particoes['pacientes_hora'][u] for u in selected_chegada}
+            rotulo_chegada = armazenamento.rotulo_unidades(particoes_chegada)
+
+            with rastreador.span('Volume diário e perfil horário'):
+                df_volumetria = ingestao.combinar_somas(
+                    ingestao.agregar_particoes(particoes_chegada, eda.volume_diario),
+                    ['Data'],
+                    'Quantidade de Pacientes'
+                )
+                df_volumetria.columns = ['ds', 'y']
+                perfil = capacidade.perfil_horario(ingestao.combinar_somas(
+                    ingestao.agregar_particoes(particoes_chegada, eda.somar_por_hora_turno),
+                    [ingestao.COLUNA_MINUTO, 'Turno'],
+                    'Quantidade de Pacientes'
+                ))
+
+            # Mesma previsão ARIMA da página de Entrada, reaproveitada do banco quando já calculada
+            with rastreador.medir_cache('Previsão ARIMA - Total') as contar_execucao:
+                df_previsao_chegadas = armazem.obter_ou_calcular(
+                    'previsoes',
+                    armazenamento.impressao_digital(df_volumetria, rotulo_chegada),
+                    {'modelo': 'ARIMA', 'ordem': previsao.ORDEM_ARIMA, 'passos': previsao.HORIZONTE, 'nivel': 'Total'},
+                    contar_execucao(lambda: previsao.prever_serie(df_volumetria, 'Total', coluna_data='ds', coluna_valor='y').assign(Unidade=rotulo_chegada))
+                )
+
+            # Utilização, tempo na fila e headcount necessário de cada etapa em todos os dias previstos
+            with rastreador.medir_cache('Projeção de capacidade'):
+                df_capacidade = projetar_capacidade(
+                    armazenamento.impressao_digital(df_previsao_chegadas[['Data', 'Previsão']], perfil),
+                    armazenamento.impressao_digital(
+                        media_tempo, {'sequencia': colunas, 'headcount': headcount_etapas, 'utilizacao_alvo': utilizacao_alvo}
+                    ),
+                    df_previsao_chegadas, perfil, colunas, media_tempo, headcount_etapas, utilizacao_alvo
+                )
+
+            st.write(f"""
+            - Chegadas previstas para {rotulo_chegada}, distribuídas pelas horas do dia conforme o perfil histórico.
+            - Cada etapa recebe o fluxo total de pacientes, com o headcount e a sequência definidos em Etapas do Processo.
+            - Utilização e fila (Wq) consideram a hora de pico de cada dia; com utilização de 100% ou mais a fila não se estabiliza (Wq infinito).
+            - O headcount necessário mantém a utilização no pico em até {utilizacao_alvo:.0%}.
+            """)
+
+            col1, col2 = st.columns(2, gap="small")
+            with col1:
+                dias_sobrecarga = df_capacidade.loc[df_capacidade['Horas em Sobrecarga'] > 0, 'Data'].nunique()
+                st.metric(label="Dias com Sobrecarga", value=f"{dias_sobrecarga} de {df_capacidade['Data'].nunique()}")
+            with col2:
+                st.metric(label="Pico de Chegadas (Pacientes/hora)", value=f"{df_capacidade['TCC Pico'].max():.2f}")
+
+            # Mapa de calor do headcount necessário por etapa e dia
+            df_headcount = df_capacidade.pivot(index='Etapa', columns='Data', values='Headcount Necessário').reindex(colunas)
+            fig_headcount = px.imshow(
+                df_headcount,
+                text_auto=True,
+                aspect='auto',
+                color_continuous_scale='Reds',
+                title="Headcount Necessário por Etapa (hora de pico)"
+            )
+            fig_headcount.update_layout(xaxis_title="Data", yaxis_title="Etapa")
+            st.plotly_chart(fig_headcount, use_container_width=True)
+
+            # Fator de utilização no pico com o headcount atual
+            fig_utilizacao_projetada = px.line(
+                df_capacidade,
+                x='Data',
+                y='Fator de Utilização Pico (%)',
+                color='Etapa',
+                title="Fator de Utilização Projetado com o Headcount Atual (%)"
+            )
+            fig_utilizacao_projetada.add_hline(y=100, line_dash='dash', line_color='red')
+            fig_utilizacao_projetada.update_layout(hovermode="x unified")
+            st.plotly_chart(fig_utilizacao_projetada, use_container_width=True)
+
+            st.dataframe(df_capacidade.style.format(precision=2), hide_index=True)
+        else:
+            st.info("Envie também o arquivo de chegadas no template 'amostra_pacientes_hora.xlsx' para projetar a capacidade a partir da previsão.")
+
+# ======================================================
+# Painel de desempenho (opcional)
+# ======================================================
+instrumentacao.exibir_painel(rastreador)
+
 # ======================================================
 # Rodapé
 # ======================================================
@@ -0,0 +1,189 @@
+import json
+
+import streamlit as st
+import plotly.express as px
+from PIL import Image
+
+from utils import armazenamento, previsao
+
+# ===============================
+# Configuração da Página
+# ===============================
+st.set_page_config(
+    page_title="Histórico",
+    layout="wide"
+)
+
+# ===============================
+# Sidebar - Barra Lateral
+# ===============================
+st.sidebar.markdown("""---""")
+
+# Carregar a imagem na sidebar
+image_path = 'app.png'
+image = Image.open(image_path)
+st.sidebar.image(image, width=190)
+
+st.sidebar.markdown("""
+    <h1 style='display: inline; font-size: 28px;'>LeanFlow</h1>
+    <h2 style='display: inline; font-size: 18px;'>➤</h2>
+    """, unsafe_allow_html=True)
+st.sidebar.markdown('### Simplificando fluxos, melhorando vidas')
+st.sidebar.markdown("""---""")
+
+# ===============================
+# Banco local de resultados
+# ===============================
+@st.cache_resource
+def abrir_armazem():
+    return armazenamento.ArmazemResultados()
+
+armazem = abrir_armazem()
+
+# ===================================
+# Filtros interativos
+# ===================================
+unidades = sorted(set(armazem.unidades('previsoes')) | set(armazem.unidades('metricas_etapa')))
+selected_unidades = st.sidebar.multiselect('Selecione as Unidades', unidades, default=unidades)
+
+selected_dates = st.sidebar.date_input('Selecione o intervalo de datas', value=(), format='DD/MM/YYYY')
+data_inicio = selected_dates[0] if len(selected_dates) > 0 else None
+data_fim = selected_dates[1] if len(selected_dates) > 1 else None
+
+etapas = armazem.etapas()
+selected_etapas = st.sidebar.multiselect('Selecione as Etapas', etapas, default=etapas)
+
+st.sidebar.markdown("""---""")
+
+st.sidebar.markdown('##### Desenvolvido por [@FranciscoPena](https://www.linkedin.com/in/franciscobpena/) & [@DanielMeireles](https://www.linkedin.com/in/daniel-meireles-processos/) 🤓')
+
+# ===============================
+# Corpo principal da página
+# ===============================
+st.header("🏥Visão Histórica por:")
+
+tab1, tab2, tab3 = st.tabs(['🚶‍➡️ Previsões de Entrada', '🔜 Etapas do Processo', '📊 Indicadores'])
+
+if not unidades:
+    st.warning("Ainda não há resultados gravados. Utilize as páginas de Entrada e Desempenho para gerá-los.")
+
+# ======================================================
+# Tab 1: Previsões gravadas
+# ======================================================
+with tab1:
+    df_previsoes = armazem.consultar('previsoes', selected_unidades, data_inicio, data_fim)
+    if not df_previsoes.empty:
+        # Modelo de cada previsão (ARIMA independente ou hierárquica reconciliada), a partir dos parâmetros gravados
+        df_previsoes['Modelo'] = df_previsoes['Parâmetros'].map(lambda p: previsao.descrever_modelo(json.loads(p)))
+
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            modelos = sorted(df_previsoes['Modelo'].unique())
+            selected_modelos = st.multiselect('Modelos de previsão', modelos, default=modelos)
+        with col2:
+            incluir_horas = st.checkbox('Incluir séries por hora', value=False)
+
+        df_previsoes = df_previsoes[df_previsoes['Modelo'].isin(selected_modelos)]
+        if not incluir_horas:
+            # As séries Turno x Hora ('Turno N - HH:MM') ficam fora do gráfico por padrão
+            df_previsoes = df_previsoes[~df_previsoes['Nível'].str.contains(' - ', regex=False)]
+
+        # Para cada data, manter a previsão mais recente de cada unidade, modelo e nível
+        df_previsoes = df_previsoes.drop_duplicates(subset=['Unidade', 'Modelo', 'Nível', 'Data'], keep='last')
+        df_previsoes['Série'] = df_previsoes['Unidade'] + ' - ' + df_previsoes['Modelo'] + ' - ' + df_previsoes['Nível']
+
+        fig_previsoes = px.line(
+            df_previsoes,
+            x='Data',
+            y='Previsão',
+            color='Série',
+            title="Previsões de Entrada de Pacientes Gravadas"
+        )
+        fig_previsoes.update_layout(
+            xaxis_title="Data",
+            yaxis_title="Quantidade de Pacientes",
+            legend_title="Unidade - Modelo - Nível",
+            hovermode="x unified"
+        )
+        st.plotly_chart(fig_previsoes, use_container_width=True)
+    else:
+        st.info("Nenhuma previsão gravada para os filtros selecionados.")
+
+# ======================================================
+# Tab 2: Métricas por etapa ao longo dos períodos
+# ======================================================
+with tab2:
+    df_metricas = armazem.consultar('metricas_etapa', selected_unidades, data_inicio, data_fim, selected_etapas)
+    if not df_metricas.empty:
+        # Para cada período, manter o cálculo mais recente de cada unidade e etapa
+        df_etapas = df_metricas.drop_duplicates(subset=['Unidade', 'Data Inicial', 'Data Final', 'Etapa'], keep='last')
+
+        col1, col2 = st.columns(2)
+        with col1:
+            fig_utilizacao = px.line(
+                df_etapas,
+                x='Data Final',
+                y='Fator de Utilização (%)',
+                color='Etapa',
+                line_dash='Unidade',
+                markers=True,
+                title="Fator de Utilização por Etapa (%)"
+            )
+            st.plotly_chart(fig_utilizacao, use_container_width=True)
+
+        with col2:
+            fig_fila = px.line(
+                df_etapas,
+                x='Data Final',
+                y='Tempo na Fila (min)',
+                color='Etapa',
+                line_dash='Unidade',
+                markers=True,
+                title="Tempo de Fila por Etapa (min)"
+            )
+            st.plotly_chart(fig_fila, use_container_width=True)
+
+        st.dataframe(df_etapas)
+    else:
+        st.info("Nenhuma métrica por etapa gravada para os filtros selecionados.")
+
+# ======================================================
+# Tab 3: Leadtime e agregação de valor
+# ======================================================
+with tab3:
+    df_indicadores = armazem.consultar('indicadores', selected_unidades, data_inicio, data_fim)
+    if not df_indicadores.empty:
+        df_indicadores = df_indicadores.drop_duplicates(subset=['Unidade', 'Data Inicial', 'Data Final'], keep='last')
+
+        col1, col2 = st.columns(2)
+        with col1:
+            fig_leadtime = px.line(
+                df_indicadores,
+                x='Data Final',
+                y='Leadtime (min)',
+                color='Unidade',
+                markers=True,
+                title="Leadtime (Minutos)"
+            )
+            st.plotly_chart(fig_leadtime, use_container_width=True)
+
+        with col2:
+            fig_tav = px.line(
+                df_indicadores,
+                x='Data Final',
+                y='TAV (%)',
+                color='Unidade',
+                markers=True,
+                title="Tempo Agregado de Valor (%)"
+            )
+            st.plotly_chart(fig_tav, use_container_width=True)
+    else:
+        st.info("Nenhum indicador gravado para os filtros selecionados.")
+
+# ======================================================
+# Rodapé
+# ======================================================
+st.markdown("""
+    ---
+    © 2024 LeanMasterAcademy 🦎. Todos os direitos reservados.
+""")
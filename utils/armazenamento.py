@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+# ===============================
+# Armazenamento local de resultados
+# ===============================
+# Cada conjunto de resultados é gravado uma única vez por (tipo, impressão digital
+# dos dados, parâmetros). As tabelas são indexadas por unidade, data e etapa para
+# que os painéis históricos consultem o banco em vez de recalcular.
+CAMINHO_PADRAO = os.environ.get('LEANFLOW_RESULTADOS', os.path.join('resultados', 'leanflow.sqlite3'))
+
+# Colunas do DataFrame -> colunas SQL de cada tipo de resultado
+TABELAS = {
+    'previsoes': {
+        'Unidade': 'unidade',
+        'Nível': 'nivel',
+        'Data': 'data',
+        'Previsão': 'previsao',
+    },
+    'metricas_etapa': {
+        'Unidade': 'unidade',
+        'Data Inicial': 'data_inicio',
+        'Data Final': 'data_fim',
+        'Etapa': 'etapa',
+        'Headcount': 'headcount',
+        'Headcount Necessário': 'headcount_necessario',
+        'TCC': 'tcc',
+        'TAF': 'taf',
+        'Fator de Utilização (%)': 'fator_utilizacao',
+        'Clientes na Fila': 'clientes_fila',
+        'Tempo na Fila (h)': 'tempo_fila_h',
+        'Tempo na Fila (min)': 'tempo_fila_min',
+    },
+    'indicadores': {
+        'Unidade': 'unidade',
+        'Data Inicial': 'data_inicio',
+        'Data Final': 'data_fim',
+        'Leadtime (min)': 'leadtime_min',
+        'TAV (min)': 'tav_min',
+        'TNAV (min)': 'tnav_min',
+        'TAV (%)': 'tav_percent',
+        'TNAV (%)': 'tnav_percent',
+        'Saídas (Pacientes/h)': 'saidas_hora',
+    },
+}
+
+# Coluna de data usada nas consultas por intervalo de cada tabela
+COLUNA_DATA = {'previsoes': 'data', 'metricas_etapa': 'data_fim', 'indicadores': 'data_fim'}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    criado_em TEXT NOT NULL,
+    UNIQUE (tipo, fingerprint, parametros)
+);
+CREATE TABLE IF NOT EXISTS previsoes (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    unidade TEXT, nivel TEXT, data TEXT, previsao REAL
+);
+CREATE TABLE IF NOT EXISTS metricas_etapa (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    unidade TEXT, data_inicio TEXT, data_fim TEXT, etapa TEXT,
+    headcount INTEGER, headcount_necessario INTEGER, tcc REAL, taf REAL,
+    fator_utilizacao REAL, clientes_fila REAL, tempo_fila_h REAL, tempo_fila_min REAL
+);
+CREATE TABLE IF NOT EXISTS indicadores (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    unidade TEXT, data_inicio TEXT, data_fim TEXT,
+    leadtime_min REAL, tav_min REAL, tnav_min REAL,
+    tav_percent REAL, tnav_percent REAL, saidas_hora REAL
+);
+CREATE INDEX IF NOT EXISTS ix_previsoes_execucao ON previsoes (execucao_id);
+CREATE INDEX IF NOT EXISTS ix_previsoes_unidade_data ON previsoes (unidade, data);
+CREATE INDEX IF NOT EXISTS ix_metricas_execucao ON metricas_etapa (execucao_id);
+CREATE INDEX IF NOT EXISTS ix_metricas_unidade_etapa_data ON metricas_etapa (unidade, etapa, data_fim);
+CREATE INDEX IF NOT EXISTS ix_indicadores_execucao ON indicadores (execucao_id);
+CREATE INDEX IF NOT EXISTS ix_indicadores_unidade_data ON indicadores (unidade, data_fim);
+"""
+
+
+# Versão dos cálculos: incrementar quando a forma de calcular algum resultado mudar,
+# para que os resultados gravados anteriormente não sejam reaproveitados
+VERSAO_RESULTADOS = 3
+
+
+def impressao_digital(*objetos):
+    """Gera a impressão digital (hash) de DataFrames e valores simples, usada como chave dos resultados."""
+    h = hashlib.sha256()
+    h.update(f'v{VERSAO_RESULTADOS}'.encode())
+    for obj in objetos:
+        if isinstance(obj, pd.DataFrame):
+            h.update(json.dumps(list(map(str, obj.columns))).encode())
+            h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+        else:
+            h.update(_serializar(obj).encode())
+    return h.hexdigest()[:32]
+
+
+def _serializar(parametros):
+    return json.dumps(parametros, sort_keys=True, default=str, ensure_ascii=False)
+
+
+class ArmazemResultados:
+    """Banco SQLite local com os resultados calculados pelas páginas."""
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with closing(self._conectar()) as conn:
+            conn.executescript(_ESQUEMA)
+
+    def _conectar(self):
+        # Uma conexão por operação: as execuções do Streamlit ocorrem em threads diferentes
+        return sqlite3.connect(self.caminho, timeout=30)
+
+    def buscar(self, tipo, fingerprint, parametros):
+        """Retorna o resultado já gravado para (tipo, fingerprint, parâmetros), ou None."""
+        colunas = TABELAS[tipo]
+        with closing(self._conectar()) as conn:
+            linha = conn.execute(
+                "SELECT id FROM execucoes WHERE tipo = ? AND fingerprint = ? AND parametros = ?",
+                (tipo, fingerprint, _serializar(parametros))
+            ).fetchone()
+            if linha is None:
+                return None
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(colunas.values())} FROM {tipo} WHERE execucao_id = ? ORDER BY rowid",
+                conn, params=(linha[0],)
+            )
+        return self._para_dataframe(tipo, df)
+
+    def salvar(self, tipo, fingerprint, parametros, df):
+        """Grava um conjunto de resultados; conjuntos já existentes são mantidos."""
+        colunas = TABELAS[tipo]
+        registros = df[list(colunas)].copy()
+        for coluna in registros.columns:
+            if pd.api.types.is_datetime64_any_dtype(registros[coluna]):
+                registros[coluna] = registros[coluna].dt.strftime('%Y-%m-%d')
+        registros.columns = list(colunas.values())
+
+        with closing(self._conectar()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO execucoes (tipo, fingerprint, parametros, criado_em) VALUES (?, ?, ?, ?)",
+                (tipo, fingerprint, _serializar(parametros), datetime.now().isoformat(timespec='seconds'))
+            )
+            if cursor.rowcount == 0:
+                return
+            registros.insert(0, 'execucao_id', cursor.lastrowid)
+            registros.to_sql(tipo, conn, if_exists='append', index=False)
+
+    def obter_ou_calcular(self, tipo, fingerprint, parametros, calcular):
+        """Retorna o resultado gravado ou executa `calcular()`, grava e retorna o novo resultado."""
+        df = self.buscar(tipo, fingerprint, parametros)
+        if df is None:
+            df = calcular()
+            self.salvar(tipo, fingerprint, parametros, df)
+        return df
+
+    def consultar(self, tipo, unidades=None, data_inicio=None, data_fim=None, etapas=None):
+        """
+        Consulta por intervalo os resultados gravados, filtrando por unidade, data e etapa.
+
+        Cada linha traz também o momento do cálculo e os parâmetros da execução (JSON),
+        para distinguir resultados de modelos ou cenários diferentes.
+        """
+        colunas = TABELAS[tipo]
+        coluna_data = COLUNA_DATA[tipo]
+        condicoes, params = [], []
+        if unidades:
+            condicoes.append(f"t.unidade IN ({', '.join('?' * len(unidades))})")
+            params.extend(unidades)
+        if data_inicio is not None:
+            condicoes.append(f"t.{coluna_data} >= ?")
+            params.append(pd.Timestamp(data_inicio).strftime('%Y-%m-%d'))
+        if data_fim is not None:
+            condicoes.append(f"t.{coluna_data} <= ?")
+            params.append(pd.Timestamp(data_fim).strftime('%Y-%m-%d'))
+        if etapas and 'etapa' in colunas.values():
+            condicoes.append(f"t.etapa IN ({', '.join('?' * len(etapas))})")
+            params.extend(etapas)
+
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+        sql = (
+            f"SELECT e.criado_em, e.parametros, {', '.join('t.' + c for c in colunas.values())} "
+            f"FROM {tipo} t JOIN execucoes e ON e.id = t.execucao_id {where} "
+            f"ORDER BY t.{coluna_data}, e.criado_em"
+        )
+        with closing(self._conectar()) as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        df = self._para_dataframe(tipo, df)
+        return df.rename(columns={'criado_em': 'Calculado em', 'parametros': 'Parâmetros'})
+
+    def unidades(self, tipo):
+        """Lista as unidades com resultados gravados para o tipo informado."""
+        with closing(self._conectar()) as conn:
+            linhas = conn.execute(f"SELECT DISTINCT unidade FROM {tipo} ORDER BY unidade").fetchall()
+        return [linha[0] for linha in linhas]
+
+    def etapas(self):
+        """Lista as etapas com métricas gravadas."""
+        with closing(self._conectar()) as conn:
+            linhas = conn.execute("SELECT DISTINCT etapa FROM metricas_etapa ORDER BY etapa").fetchall()
+        return [linha[0] for linha in linhas]
+
+    def _para_dataframe(self, tipo, df):
+        nomes = {sql: coluna for coluna, sql in TABELAS[tipo].items()}
+        df = df.rename(columns=nomes)
+        for coluna in ('Data', 'Data Inicial', 'Data Final'):
+            if coluna in df.columns:
+                df[coluna] = pd.to_datetime(df[coluna])
+        return df
+
+
+def rotulo_unidades(unidades):
+    """Rótulo gravado na coluna 'Unidade' para uma seleção de uma ou mais unidades."""
+    return ', '.join(sorted(map(str, unidades)))
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from utils import filas, ingestao
+
+# ===============================
+# Planejamento de capacidade a partir da previsão de chegadas
+# ===============================
+# A previsão diária de pacientes é distribuída pelas horas do dia segundo o perfil
+# histórico e aplicada ao modelo de filas de cada etapa, para todos os dias e horas
+# de uma só vez. Cada etapa recebe o fluxo total de chegadas, como na sequência do processo.
+
+
+def perfil_horario(df_hora):
+    """
+    Participação de cada horário nas chegadas, a partir do DataFrame (Minuto do Dia, ..., Quantidade de Pacientes).
+
+    Retorna o DataFrame (Minuto do Dia, Participação), com as participações somando 1.
+    """
+    soma = df_hora.groupby(ingestao.COLUNA_MINUTO)['Quantidade de Pacientes'].sum().sort_index()
+    total = soma.sum()
+    participacao = soma / total if total > 0 else pd.Series(1 / len(soma), index=soma.index)
+    return participacao.rename('Participação').reset_index()
+
+
+def chegadas_por_hora(df_previsao, perfil):
+    """Matriz (dias x horários) com a taxa de chegada prevista em pacientes/hora."""
+    minutos = perfil[ingestao.COLUNA_MINUTO].to_numpy()
+    duracao_h = np.diff(minutos).min() / 60 if len(minutos) > 1 else 1.0  # Duração de cada horário
+    diaria = np.clip(df_previsao['Previsão'].to_numpy(dtype=float), 0, None)
+    return diaria[:, None] * perfil['Participação'].to_numpy()[None, :] / duracao_h
+
+
+def projetar_capacidade(df_previsao, perfil, etapas, media_tempo, headcount_etapas, utilizacao_alvo=filas.UTILIZACAO_ALVO):
+    """
+    Projeta utilização, fila (Lq e Wq) e headcount necessário por Etapa para cada dia previsto.
+
+    `df_previsao` traz (Data, Previsão) com as chegadas diárias; `perfil` é o resultado de
+    perfil_horario. As métricas são calculadas para cada hora e resumidas no pico do dia.
+    O headcount necessário é o menor que mantém a utilização no pico em até `utilizacao_alvo` (< 1).
+    """
+    if not 0 < utilizacao_alvo < 1:
+        raise ValueError("A utilização alvo deve estar entre 0 e 1 (exclusive).")
+
+    tc = media_tempo.set_index('Etapa')['Tempo (Minutos)'].reindex(etapas).to_numpy(dtype=float)
+    headcount = np.array([headcount_etapas[etapa] for etapa in etapas], dtype=float)
+    tcc = chegadas_por_hora(df_previsao, perfil)
+
+    # Dias x horários x etapas em uma única chamada
+    metricas = filas.calcular_metricas(tc, headcount, tcc[:, :, None])
+
+    # Dimensionado pela taxa de chegada no pico de cada dia
+    headcount_necessario = filas.headcount_necessario(tc[None, :], tcc.max(axis=1)[:, None], utilizacao_alvo).astype(int)
+
+    n_dias, n_etapas = len(df_previsao), len(etapas)
+    return pd.DataFrame({
+        'Data': np.repeat(df_previsao['Data'].to_numpy(), n_etapas),
+        'Etapa': np.tile([str(etapa) for etapa in etapas], n_dias),
+        'Headcount': np.tile(headcount.astype(int), n_dias),
+        'Headcount Necessário': headcount_necessario.ravel(),
+        'TCC Média': np.repeat(tcc.mean(axis=1), n_etapas),
+        'TCC Pico': np.repeat(tcc.max(axis=1), n_etapas),
+        'Fator de Utilização Pico (%)': metricas['Fator de Utilização (%)'].max(axis=1).ravel(),
+        'Clientes na Fila Pico': metricas['Clientes na Fila'].max(axis=1).ravel(),
+        'Wq Pico (min)': metricas['Wq (min)'].max(axis=1).ravel(),
+        'Horas em Sobrecarga': np.isinf(metricas['Wq (min)']).sum(axis=1).ravel(),
+    })
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from utils import ingestao
+
+# ===============================
+# Agregações e estatísticas das páginas
+# ===============================
+# Funções aplicadas por partição (unidade) e consolidadas com ingestao.combinar_somas.
+
+
+def somar_por_hora_turno(particao):
+    """Quantidade de pacientes por minuto do dia e turno."""
+    return particao.groupby(
+        [ingestao.COLUNA_MINUTO, 'Turno'], observed=True
+    )['Quantidade de Pacientes'].sum().reset_index()
+
+
+def volume_diario(particao):
+    """Quantidade de pacientes por dia."""
+    return particao.groupby('Data')['Quantidade de Pacientes'].sum().reset_index()
+
+
+def volume_diario_turno(particao):
+    """Quantidade de pacientes por dia e turno."""
+    return particao.groupby(['Data', 'Turno'], observed=True)['Quantidade de Pacientes'].sum().reset_index()
+
+
+def volume_diario_por(particao, colunas):
+    """Quantidade de pacientes por dia e pelas colunas informadas (ex.: Turno e Minuto do Dia)."""
+    return particao.groupby(['Data'] + list(colunas), observed=True)['Quantidade de Pacientes'].sum().reset_index()
+
+
+def calcular_moda(x):
+    modos = x.mode()
+    if not modos.empty:
+        return modos.iloc[0]
+    return None
+
+
+def estatisticas_por_turno(df):
+    """Moda, mediana, média e desvio padrão da quantidade de pacientes por turno."""
+    return df.groupby('Turno', observed=True)['Quantidade de Pacientes'].agg(
+        Moda=calcular_moda,
+        Mediana='median',
+        Media='mean',
+        Desvio_Padrao='std'
+    ).reset_index()
+
+
+def somar_tempo_por_etapa(particao):
+    """Soma e contagem do tempo de ciclo por etapa."""
+    return particao.groupby('Etapa', observed=True)['Tempo (Minutos)'].agg(['sum', 'count']).reset_index()
+
+
+def tempo_medio_por_etapa(parciais):
+    """Consolida as somas e contagens parciais de cada unidade no tempo médio (Etapa, Tempo (Minutos))."""
+    soma_etapa = pd.concat(parciais.values(), ignore_index=True).groupby('Etapa', observed=True)[['sum', 'count']].sum()
+    return (soma_etapa['sum'] / soma_etapa['count']).rename('Tempo (Minutos)').reset_index()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Utilização máxima desejada no dimensionamento do headcount (abaixo de 100% para a fila se estabilizar)
+UTILIZACAO_ALVO = 0.85
+
+
+def headcount_necessario(tc, tcc, utilizacao_alvo=UTILIZACAO_ALVO):
+    """Menor headcount que mantém a utilização em até `utilizacao_alvo` (carga em horas de atendimento / alvo)."""
+    return np.ceil(tcc * tc / 60 / utilizacao_alvo)
+
+
+def calcular_metricas(tc, headcount, tcc):
+    """
+    Fórmulas do modelo de filas, vetorizadas: os argumentos são combinados por broadcast
+    (ex.: tempo de ciclo e headcount por etapa contra taxas de chegada dias x horas x etapas).
+
+    Com utilização de 100% ou mais a fila não se estabiliza: clientes e tempo de espera (Wq)
+    são infinitos. 'Wq (min)' é o tempo de espera na fila em minutos e o 'Headcount Necessário'
+    segue a UTILIZACAO_ALVO.
+    """
+    taf = headcount / tc * 60  # Taxa de atendimento (pacientes/hora)
+    utilizacao = tcc / taf     # Fator de utilização
+    estavel = utilizacao < 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        clientes_fila = np.where(estavel, utilizacao * (tcc / (taf - tcc)), np.inf)
+        tempo_fila_h = np.where(estavel, utilizacao * (1 / (taf - tcc)), np.inf)
+        return {
+            'Headcount Necessário': headcount_necessario(tc, tcc),
+            'TAF': taf,
+            'Fator de Utilização (%)': np.round(utilizacao * 100, 2),
+            'Clientes na Fila': clientes_fila,
+            'Tempo na Fila (h)': tempo_fila_h,
+            'Tempo na Fila (min)': utilizacao * 60,
+            'Wq (min)': tempo_fila_h * 60,
+        }
+
+
+def calcular_tabela(etapas, media_tempo, headcount_etapas, taxa_chegada_etapas):
+    """
+    Monta a tabela de desempenho do processo (df_tabela) para as etapas na ordem informada.
+
+    `media_tempo` é o DataFrame (Etapa, Tempo (Minutos)) com o tempo de ciclo médio,
+    e os dicionários trazem o headcount e a taxa de chegada (pacientes/hora) por etapa.
+    """
+    tc = media_tempo.set_index('Etapa')['Tempo (Minutos)'].reindex(etapas).to_numpy(dtype=float)
+    headcount = np.array([headcount_etapas[etapa] for etapa in etapas], dtype=float)
+    tcc = np.array([taxa_chegada_etapas[etapa] for etapa in etapas], dtype=float)
+
+    metricas = calcular_metricas(tc, headcount, tcc)
+
+    df_tabela = pd.DataFrame({
+        'Etapa': [str(etapa) for etapa in etapas],
+        'Headcount': [headcount_etapas[etapa] for etapa in etapas],
+        'Headcount Necessário': metricas['Headcount Necessário'].astype(int),
+        'TCC': [taxa_chegada_etapas[etapa] for etapa in etapas],
+        'TAF': metricas['TAF'],
+        'Fator de Utilização (%)': metricas['Fator de Utilização (%)'],
+        'Clientes na Fila': metricas['Clientes na Fila'],
+        'Tempo na Fila (h)': metricas['Tempo na Fila (h)'],
+        'Tempo na Fila (min)': metricas['Tempo na Fila (min)'],
+    })
+    return df_tabela
+
+
+def calcular_indicadores(df_tabela, tempo_agregado):
+    """Calcula leadtime, proporção TAV/TNAV e saídas por hora a partir da tabela de desempenho."""
+    nav = df_tabela['Tempo na Fila (min)'].sum()  # Tempo Não Agregado de Valor
+    av = float(tempo_agregado)                    # Tempo Agregado de Valor
+    leadtime = av + nav
+    tav_percent = (av / leadtime) * 100 if leadtime > 0 else 0
+    menor_taf = df_tabela['TAF'].min()
+
+    return {
+        'Leadtime (min)': leadtime,
+        'TAV (min)': av,
+        'TNAV (min)': nav,
+        'TAV (%)': tav_percent,
+        'TNAV (%)': 100 - tav_percent,
+        'Saídas (Pacientes/h)': 1 / menor_taf if menor_taf > 0 else 0,
+    }
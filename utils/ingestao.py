@@ -0,0 +1,303 @@
+import io
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+# ===============================
+# Esquemas dos templates
+# ===============================
+# Cada tipo de arquivo é reconhecido pelas colunas obrigatórias,
+# e não mais pelo nome do arquivo enviado.
+ESQUEMAS = {
+    'pacientes_hora': ['Data', 'Hora', 'Turno', 'Quantidade de Pacientes'],
+    'tempo_ciclo': ['Data', 'Etapa', 'Tempo (Minutos)'],
+}
+
+COLUNA_UNIDADE = 'Unidade'
+
+# Meses por extenso e abreviados (português e inglês), usados nos sufixos de período
+_MESES = (
+    'janeiro|fevereiro|março|marco|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro|'
+    'january|february|march|april|june|july|august|september|october|november|december|'
+    'jan|fev|feb|mar|abr|apr|mai|may|jun|jul|ago|aug|set|sep|sept|out|oct|nov|dez|dec'
+)
+
+# Sufixos de período no nome do arquivo (ex.: "_2024-09", "-092024", "_set2024", "_setembro-2024")
+_SUFIXO_PERIODO = re.compile(
+    rf'[_\-\s]+(\d{{4}}[_\-]?\d{{2}}|\d{{2}}[_\-]?\d{{4}}|(?:{_MESES})[_\-]?\d{{4}})$',
+    re.IGNORECASE
+)
+
+
+def detectar_tipo(df):
+    """Retorna o tipo do arquivo ('pacientes_hora' ou 'tempo_ciclo') a partir das colunas, ou None."""
+    colunas = set(df.columns)
+    for tipo, obrigatorias in ESQUEMAS.items():
+        if colunas.issuperset(obrigatorias):
+            return tipo
+    return None
+
+
+def unidade_padrao(nome_arquivo):
+    """Sugere o nome da unidade a partir do nome do arquivo, sem a extensão e o sufixo de período."""
+    base = os.path.splitext(os.path.basename(nome_arquivo))[0]
+    return _SUFIXO_PERIODO.sub('', base) or base
+
+
+class ErroEsquema(ValueError):
+    """Arquivo reconhecido como um dos templates, mas com dados fora do formato esperado."""
+
+
+# Colunas convertidas em categoria e colunas numéricas de cada tipo
+COLUNAS_CATEGORICAS = {
+    'pacientes_hora': ['Turno'],
+    'tempo_ciclo': ['Etapa', 'Turno'],
+}
+COLUNAS_NUMERICAS = {
+    'pacientes_hora': ['Quantidade de Pacientes'],
+    'tempo_ciclo': ['ID', 'Tempo (Minutos)'],
+}
+
+COLUNA_MINUTO = 'Minuto do Dia'
+
+# Horários como "06:00", "06:00:00" ou "2024-09-02 06:00:00"
+_HORARIO = r'(\d{1,2}):(\d{2})(?::\d{2}(?:\.\d+)?)?$'
+
+
+def minutos_do_dia(hora):
+    """
+    Converte de forma vetorizada a coluna 'Hora' (texto, time ou número) em minutos do dia.
+
+    Números em [0, 1) são frações de dia do Excel e inteiros de 0 a 23 são horas cheias;
+    qualquer outro valor vira NaN e é reportado como horário inválido.
+    """
+    if pd.api.types.is_numeric_dtype(hora):
+        valores = hora.astype(float)
+        minutos = (valores * 1440).round().where((valores >= 0) & (valores < 1))
+        minutos = minutos.fillna((valores * 60).where((valores % 1 == 0) & (valores >= 1) & (valores <= 23)))
+    elif pd.api.types.is_datetime64_any_dtype(hora):
+        minutos = hora.dt.hour * 60 + hora.dt.minute
+    else:
+        # Os horários se repetem muito: interpreta apenas os valores distintos
+        if isinstance(hora.dtype, pd.CategoricalDtype):
+            codigos, valores = hora.cat.codes.to_numpy(), hora.cat.categories.astype(str).str.strip()
+        else:
+            codigos, valores = pd.factorize(hora.astype(str).str.strip())
+        partes = pd.Series(valores).str.extract(_HORARIO)
+        horas = pd.to_numeric(partes[0], errors='coerce')
+        por_valor = horas * 60 + pd.to_numeric(partes[1], errors='coerce')
+        por_valor = por_valor.where((horas < 24) & (partes[1].astype(float) < 60)).to_numpy()
+        minutos = pd.Series(por_valor[codigos], index=hora.index)
+        minutos[codigos < 0] = float('nan')
+    return minutos
+
+
+def formatar_minutos(minutos):
+    """Formata minutos do dia como 'HH:MM'."""
+    minutos = pd.Series(minutos).astype(int)
+    return (minutos // 60).astype(str).str.zfill(2) + ':' + (minutos % 60).astype(str).str.zfill(2)
+
+
+def normalizar(df, tipo):
+    """
+    Valida o esquema e compacta os tipos de um arquivo recém-carregado.
+
+    Datas são convertidas uma única vez, 'Hora' vira minutos do dia (inteiro), colunas de
+    texto repetitivas viram categorias e as contagens são reduzidas ao menor inteiro possível.
+    Levanta ErroEsquema descrevendo os problemas encontrados.
+    """
+    problemas = []
+
+    datas = pd.to_datetime(df['Data'], format='%Y-%m-%d', errors='coerce')
+    if datas.isna().any():
+        problemas.append(f"{datas.isna().sum()} valor(es) inválido(s) na coluna 'Data'")
+    df['Data'] = datas
+
+    if tipo == 'pacientes_hora':
+        minutos = minutos_do_dia(df['Hora'])
+        if minutos.isna().any():
+            problemas.append(f"{minutos.isna().sum()} horário(s) inválido(s) na coluna 'Hora'")
+        else:
+            df[COLUNA_MINUTO] = minutos.astype('int16')
+            df = df.drop(columns='Hora')
+
+    for coluna in COLUNAS_NUMERICAS[tipo]:
+        if coluna not in df.columns:
+            continue
+        valores = pd.to_numeric(df[coluna], errors='coerce')
+        if valores.isna().any():
+            problemas.append(f"{valores.isna().sum()} valor(es) não numérico(s) na coluna '{coluna}'")
+        elif (valores < 0).any():
+            problemas.append(f"valores negativos na coluna '{coluna}'")
+        elif (valores % 1 == 0).all():
+            df[coluna] = pd.to_numeric(valores.astype('int64'), downcast='integer')
+        else:
+            df[coluna] = valores
+
+    if problemas:
+        raise ErroEsquema('; '.join(problemas))
+
+    for coluna in COLUNAS_CATEGORICAS[tipo]:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def ler_arquivo(nome_arquivo, conteudo):
+    """
+    Lê um arquivo Excel enviado e retorna (tipo, DataFrame normalizado).
+
+    A unidade não é atribuída aqui (ver atribuir_unidade), para que a leitura dependa
+    apenas do conteúdo do arquivo; uma coluna 'Unidade' do próprio arquivo é mantida.
+    """
+    df = pd.read_excel(io.BytesIO(conteudo))
+    tipo = detectar_tipo(df)
+    if tipo is None:
+        return None, df
+
+    if COLUNA_UNIDADE in df.columns:
+        df[COLUNA_UNIDADE] = df[COLUNA_UNIDADE].astype(str).astype('category')
+    return tipo, normalizar(df, tipo)
+
+
+def atribuir_unidade(df, unidade):
+    """Preenche a coluna 'Unidade' (categoria); a coluna do próprio arquivo tem prioridade."""
+    if COLUNA_UNIDADE in df.columns:
+        return df
+    return df.assign(**{COLUNA_UNIDADE: pd.Categorical([unidade] * len(df))})
+
+
+def _unificar_categorias(frames):
+    # Alinha as categorias entre arquivos para que a concatenação mantenha o tipo 'category'.
+    # Só entram as colunas categóricas presentes em todos os arquivos (ex.: 'Turno' é opcional).
+    colunas = [
+        c for c in frames[0].columns
+        if all(c in df.columns and isinstance(df[c].dtype, pd.CategoricalDtype) for df in frames)
+    ]
+    for coluna in colunas:
+        series = [df[coluna] for df in frames]
+        if len({str(s.cat.categories.dtype) for s in series}) > 1:
+            # O mesmo campo com tipos diferentes entre arquivos (ex.: Turno 1 e '1') é comparado como texto
+            series = [s.cat.rename_categories(s.cat.categories.astype(str)) for s in series]
+        categorias = pd.api.types.union_categoricals(series, sort_categories=True).categories
+        frames = [df.assign(**{coluna: s.astype(pd.CategoricalDtype(categorias))}) for df, s in zip(frames, series)]
+    return frames
+
+
+def _concatenar(tipo, itens, ignorados):
+    # Aceita os arquivos um a um, verificando a compatibilidade apenas pelo esquema (head(0)),
+    # para que um arquivo incompatível seja ignorado sem derrubar os demais
+    aceitos = []
+    for nome, df in itens:
+        try:
+            _unificar_categorias([a.head(0) for _, a in aceitos] + [df.head(0)])
+        except (TypeError, ValueError) as erro:
+            ignorados.append((nome, f"incompatível com os demais arquivos do mesmo tipo ({erro})"))
+        else:
+            aceitos.append((nome, df))
+    if not aceitos:
+        return None
+
+    df = pd.concat(_unificar_categorias([df for _, df in aceitos]), ignore_index=True)
+    # Colunas opcionais ausentes em algum arquivo voltam a ser categoria após a concatenação
+    for coluna in COLUNAS_CATEGORICAS[tipo] + [COLUNA_UNIDADE]:
+        if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+# Abaixo deste total de bytes, iniciar os processos custa mais do que ler os arquivos em sequência
+LIMITE_LEITURA_PARALELA = 5 * 1024 * 1024
+
+
+def _ler_com_erro(arquivo):
+    try:
+        return ler_arquivo(*arquivo), None
+    except ErroEsquema as erro:
+        return (None, None), str(erro)
+    except Exception as erro:  # Arquivo corrompido ou que não é uma planilha Excel
+        return (None, None), f"não foi possível ler o arquivo ({erro})"
+
+
+def ler_planilhas(arquivos, max_workers=None):
+    """
+    Lê e normaliza uma sequência de (nome, conteúdo), retornando ((tipo, DataFrame), erro) de cada arquivo.
+
+    A leitura do Excel é limitada pelo GIL: envios grandes, com vários arquivos, são lidos em
+    processos separados quando há mais de um núcleo; os demais, em sequência.
+    """
+    max_workers = min(max_workers or os.cpu_count() or 1, len(arquivos))
+    tamanho = sum(len(conteudo) for _, conteudo in arquivos)
+    if max_workers > 1 and tamanho >= LIMITE_LEITURA_PARALELA:
+        # 'spawn' evita copiar as threads do servidor do Streamlit para os processos filhos
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto) as executor:
+            return list(executor.map(_ler_com_erro, arquivos))
+    return [_ler_com_erro(arquivo) for arquivo in arquivos]
+
+
+def consolidar(arquivos, lidos):
+    """
+    Atribui a unidade de cada (nome, conteúdo, unidade) ao resultado de ler_planilhas e concatena por tipo.
+
+    Retorna um dicionário {tipo: DataFrame} com 'Unidade' como categoria e a lista
+    de (arquivo, motivo) dos arquivos ignorados.
+    """
+    por_tipo = {}
+    ignorados = []
+    for (nome, _, unidade), ((tipo, df), erro) in zip(arquivos, lidos):
+        if erro is not None:
+            ignorados.append((nome, erro))
+        elif tipo is None:
+            ignorados.append((nome, 'não segue nenhum dos templates'))
+        else:
+            por_tipo.setdefault(tipo, []).append((nome, atribuir_unidade(df, unidade or unidade_padrao(nome))))
+
+    dados = {}
+    for tipo, itens in por_tipo.items():
+        df = _concatenar(tipo, itens, ignorados)
+        if df is not None:
+            dados[tipo] = df
+    return dados, ignorados
+
+
+def ler_arquivos(arquivos, max_workers=None):
+    """Lê, normaliza e concatena por tipo uma sequência de (nome, conteúdo, unidade); ver consolidar."""
+    lidos = ler_planilhas([(nome, conteudo) for nome, conteudo, _ in arquivos], max_workers=max_workers)
+    return consolidar(arquivos, lidos)
+
+
+def particionar(df, chave=COLUNA_UNIDADE):
+    """Separa o DataFrame em partições {unidade: DataFrame}."""
+    return {
+        str(unidade): particao.reset_index(drop=True)
+        for unidade, particao in df.groupby(chave, observed=True, sort=True)
+    }
+
+
+def filtrar_periodo(particao, data_inicio, data_fim, turnos=None):
+    """Filtra as linhas entre as datas informadas (inclusive) e, opcionalmente, pelos turnos."""
+    inicio = pd.Timestamp(data_inicio)
+    fim = pd.Timestamp(data_fim) + pd.Timedelta(days=1)
+    mascara = (particao['Data'] >= inicio) & (particao['Data'] < fim)
+    if turnos is not None:
+        mascara &= particao['Turno'].isin(turnos)
+    return particao[mascara]
+
+
+def agregar_particoes(particoes, funcao, max_workers=None):
+    """Aplica `funcao` em cada partição em paralelo e retorna {unidade: resultado}."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        resultados = executor.map(funcao, particoes.values())
+        return dict(zip(particoes.keys(), resultados))
+
+
+def combinar_somas(resultados, chaves, coluna):
+    """Soma os agregados parciais de cada partição pelas chaves informadas."""
+    frames = [r for r in resultados.values() if not r.empty]
+    if not frames:
+        return pd.DataFrame(columns=chaves + [coluna])
+    return pd.concat(frames, ignore_index=True).groupby(chaves, as_index=False, observed=True)[coluna].sum()
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+
+# ===============================
+# Instrumentação dos blocos de cálculo
+# ===============================
+# Cada execução (rerun) de uma página cria um Rastreador que mede a duração dos
+# blocos de cálculo. Os acertos de cache são acumulados durante a sessão.
+CAMINHO_SPANS = os.environ.get('LEANFLOW_SPANS', os.path.join('resultados', 'spans.jsonl'))
+EXPORTAR_SEMPRE = 'LEANFLOW_SPANS' in os.environ
+
+_local = threading.local()
+
+
+def registrar_execucao():
+    """Marca que o corpo de uma função em cache foi executado (cache miss) na thread atual."""
+    _local.execucoes = getattr(_local, 'execucoes', 0) + 1
+
+
+def _execucoes():
+    return getattr(_local, 'execucoes', 0)
+
+
+def contar_execucao(funcao):
+    """Envolve `funcao` para que sua execução seja contada como cache miss."""
+    @wraps(funcao)
+    def envolvida(*args, **kwargs):
+        registrar_execucao()
+        return funcao(*args, **kwargs)
+    return envolvida
+
+
+class Rastreador:
+    """Coleta a duração dos blocos de uma execução da página e as estatísticas de cache da sessão."""
+
+    def __init__(self, pagina, estatisticas_cache=None):
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self.spans = []
+        self.contexto = {}  # Informações do conjunto de dados (linhas, unidades...) anexadas na exportação
+        self.estatisticas_cache = estatisticas_cache if estatisticas_cache is not None else {}
+
+    @contextmanager
+    def span(self, bloco):
+        """Mede a duração do bloco de código."""
+        registro = {'bloco': bloco, 'cache': None}
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['inicio_ms'] = (inicio - self.inicio) * 1000
+            registro['duracao_ms'] = (time.perf_counter() - inicio) * 1000
+            self.spans.append(registro)
+
+    @contextmanager
+    def medir_cache(self, bloco):
+        """
+        Mede um bloco servido por cache e registra se houve acerto.
+
+        O bloco é um acerto quando nenhuma função marcada com registrar_execucao/contar_execucao
+        executa dentro dele.
+        """
+        antes = _execucoes()
+        with self.span(bloco) as registro:
+            yield contar_execucao
+            registro['cache'] = _execucoes() == antes
+        chamadas, acertos = self.estatisticas_cache.get(bloco, (0, 0))
+        self.estatisticas_cache[bloco] = (chamadas + 1, acertos + int(registro['cache']))
+
+    def resumo(self):
+        """Tabela com a duração de cada bloco desta execução."""
+        df = pd.DataFrame(self.spans, columns=['bloco', 'inicio_ms', 'duracao_ms', 'cache'])
+        df['cache'] = df['cache'].map({True: 'acerto', False: 'falta'}).fillna('-')
+        return df.rename(columns={
+            'bloco': 'Bloco', 'inicio_ms': 'Início (ms)', 'duracao_ms': 'Duração (ms)', 'cache': 'Cache'
+        })
+
+    def resumo_cache(self):
+        """Taxa de acerto de cada bloco em cache ao longo da sessão."""
+        linhas = [
+            {'Bloco': bloco, 'Chamadas': chamadas, 'Acertos': acertos, 'Taxa de Acerto (%)': 100 * acertos / chamadas}
+            for bloco, (chamadas, acertos) in self.estatisticas_cache.items()
+        ]
+        return pd.DataFrame(linhas, columns=['Bloco', 'Chamadas', 'Acertos', 'Taxa de Acerto (%)'])
+
+    def exportar(self, caminho=CAMINHO_SPANS):
+        """Acrescenta os spans desta execução a um arquivo JSON lines."""
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        momento = datetime.now().isoformat(timespec='seconds')
+        with open(caminho, 'a', encoding='utf-8') as arquivo:
+            for registro in self.spans:
+                linha = {'momento': momento, 'pagina': self.pagina, **registro, **self.contexto}
+                arquivo.write(json.dumps(linha, ensure_ascii=False, default=str) + '\n')
+
+
+def iniciar(pagina):
+    """Cria o Rastreador da execução atual, mantendo as estatísticas de cache na sessão."""
+    estatisticas = st.session_state.setdefault('estatisticas_cache', {})
+    return Rastreador(pagina, estatisticas.setdefault(pagina, {}))
+
+
+def exibir_painel(rastreador):
+    """Painel opcional de depuração na barra lateral, com os tempos por bloco e as taxas de acerto de cache."""
+    total_ms = (time.perf_counter() - rastreador.inicio) * 1000
+    rastreador.spans.append({'bloco': 'Execução completa', 'cache': None, 'inicio_ms': 0.0, 'duracao_ms': total_ms})
+    depuracao = st.sidebar.toggle('Painel de desempenho', key='painel_desempenho')
+
+    exportar = EXPORTAR_SEMPRE
+    if depuracao:
+        with st.sidebar.expander("⏱️ Tempos desta execução", expanded=True):
+            st.dataframe(rastreador.resumo().style.format(precision=1), hide_index=True)
+            st.write("Acertos de cache na sessão")
+            st.dataframe(rastreador.resumo_cache().style.format(precision=1), hide_index=True)
+            exportar = st.button("Exportar spans (JSON lines)") or exportar
+
+    if exportar:
+        rastreador.exportar()
+        if depuracao:
+            st.sidebar.caption(f"Spans gravados em {CAMINHO_SPANS}")
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+# ===============================
+# Parâmetros padrão das projeções
+# ===============================
+ORDEM_ARIMA = (5, 1, 0)
+HORIZONTE = 30  # Dias projetados
+
+
+def prever_arima(valores, passos=HORIZONTE, ordem=ORDEM_ARIMA):
+    """Ajusta um ARIMA à série informada e retorna a previsão dos próximos `passos` períodos."""
+    model_fit = ARIMA(pd.Series(valores).reset_index(drop=True), order=ordem).fit()
+    return model_fit.forecast(steps=passos).to_numpy()
+
+
+def prever_serie(df, nivel, coluna_data='Data', coluna_valor='Quantidade de Pacientes',
+                 passos=HORIZONTE, ordem=ORDEM_ARIMA):
+    """Retorna a previsão diária de uma série no formato longo (Nível, Data, Previsão)."""
+    previsao = prever_arima(df[coluna_valor], passos=passos, ordem=ordem)
+    # As datas futuras começam no dia seguinte ao último observado
+    datas = pd.date_range(start=df[coluna_data].iloc[-1] + pd.Timedelta(days=1), periods=passos, freq='D')
+    return pd.DataFrame({'Nível': nivel, 'Data': datas, 'Previsão': previsao})
+
+
+def prever_por_turno(df_turno, passos=HORIZONTE, ordem=ORDEM_ARIMA):
+    """Ajusta um ARIMA independente para cada Turno de um DataFrame (Data, Turno, Quantidade de Pacientes)."""
+    previsoes = [
+        prever_serie(df_turno[df_turno['Turno'] == turno], f'Turno {turno}', passos=passos, ordem=ordem)
+        for turno in df_turno['Turno'].unique()
+    ]
+    return pd.concat(previsoes, ignore_index=True)
+
+
+def descrever_modelo(parametros):
+    """Rótulo do modelo a partir dos parâmetros gravados com a previsão (ex.: 'ARIMA', 'MinT (Turno x Hora)')."""
+    if 'reconciliacao' in parametros:
+        return f"{parametros['reconciliacao']} ({parametros['nivel']})"
+    return parametros.get('modelo', 'Desconhecido')
+
+
+# ===============================
+# Previsão hierárquica reconciliada
+# ===============================
+# As séries base (Turno ou Turno x Hora) e os níveis agregados são ajustados juntos,
+# como um único lote de modelos AR(p) sobre a série diferenciada (o mesmo ARIMA(p,1,0)
+# sem constante, estimado por mínimos quadrados condicionais). As previsões são então
+# reconciliadas com a matriz de soma S, para que os turnos somem o total.
+NIVEIS_HIERARQUIA = {
+    'Turno': ['Turno'],
+    'Turno x Hora': ['Turno', 'Minuto do Dia'],
+}
+METODOS_RECONCILIACAO = ['MinT', 'Bottom-up']
+
+
+def ajustar_ar_em_lote(Y, p=ORDEM_ARIMA[0]):
+    """
+    Ajusta um AR(p) sobre a primeira diferença de cada linha de Y (séries x tempo).
+
+    Retorna os coeficientes (séries x p) e os resíduos dentro da amostra (séries x tempo útil).
+    """
+    Z = np.diff(np.asarray(Y, dtype=float), axis=1)
+    p = max(0, min(p, (Z.shape[1] - 1) // 2))
+    if p == 0:
+        return np.zeros((Z.shape[0], 0)), Z
+
+    janelas = np.lib.stride_tricks.sliding_window_view(Z, p + 1, axis=1)
+    alvo = janelas[..., -1]
+    X = janelas[..., :-1][..., ::-1]  # Defasagens 1..p
+
+    # Equações normais empilhadas, resolvidas de uma vez para todas as séries
+    XtX = np.einsum('kti,ktj->kij', X, X)
+    Xty = np.einsum('kti,kt->ki', X, alvo)
+    regularizacao = 1e-8 * (np.trace(XtX, axis1=1, axis2=2)[:, None, None] + 1) * np.eye(p)
+    coeficientes = np.linalg.solve(XtX + regularizacao, Xty[..., None])[..., 0]
+    residuos = alvo - np.einsum('kti,ki->kt', X, coeficientes)
+    return coeficientes, residuos
+
+
+def prever_ar_em_lote(Y, coeficientes, passos=HORIZONTE):
+    """Previsão recursiva de todas as séries de uma vez, voltando da diferença para o nível."""
+    Y = np.asarray(Y, dtype=float)
+    p = coeficientes.shape[1]
+    Z = np.diff(Y, axis=1)
+    estado = Z[:, ::-1][:, :p].copy()  # Últimas p diferenças, da mais recente para a mais antiga
+    diferencas = np.empty((Y.shape[0], passos))
+    for h in range(passos):
+        proxima = np.einsum('ki,ki->k', estado, coeficientes) if p else np.zeros(Y.shape[0])
+        diferencas[:, h] = proxima
+        if p:
+            estado = np.concatenate([proxima[:, None], estado[:, :-1]], axis=1)
+    return Y[:, -1:] + np.cumsum(diferencas, axis=1)
+
+
+def matriz_soma(base):
+    """
+    Matriz de soma S da hierarquia Total > Turno > (Hora).
+
+    `base` é um MultiIndex (ou Index) com as séries de nível mais baixo. Retorna S e
+    os rótulos das linhas: 'Total', um rótulo por turno e, se houver hora, um por série base.
+    """
+    base = pd.MultiIndex.from_frame(base.to_frame()) if not isinstance(base, pd.MultiIndex) else base
+    turnos = base.get_level_values(0)
+    rotulos_turno = [f'Turno {t}' for t in pd.unique(turnos)]
+
+    linhas = [np.ones(len(base))]
+    linhas += [(turnos == t).astype(float) for t in pd.unique(turnos)]
+    rotulos = ['Total'] + rotulos_turno
+    if base.nlevels > 1:
+        linhas += list(np.eye(len(base)))
+        rotulos += [f'Turno {t} - {_hora(m)}' for t, m in base]
+    return np.vstack(linhas), rotulos
+
+
+def _hora(minuto):
+    return f'{int(minuto) // 60:02d}:{int(minuto) % 60:02d}'
+
+
+def _covariancia_encolhida(residuos):
+    # Estimador de Schäfer-Strimmer: combinação da covariância amostral com sua diagonal
+    E = residuos - residuos.mean(axis=1, keepdims=True)
+    n = E.shape[1]
+    sigma = E @ E.T / n
+    desvio = np.sqrt(np.maximum(np.diag(sigma), 1e-12))
+    X = E / desvio[:, None]
+    correlacao = X @ X.T / n
+    w = np.einsum('it,jt->ijt', X, X)
+    var_correlacao = n / (n - 1) ** 3 * ((w - correlacao[..., None]) ** 2).sum(axis=2)
+    fora_diagonal = ~np.eye(len(sigma), dtype=bool)
+    denominador = (correlacao[fora_diagonal] ** 2).sum()
+    lam = 1.0 if denominador == 0 else float(np.clip(var_correlacao[fora_diagonal].sum() / denominador, 0, 1))
+    return lam * np.diag(np.diag(sigma)) + (1 - lam) * sigma + 1e-9 * np.eye(len(sigma))
+
+
+def reconciliar(S, previsoes_base, residuos=None, metodo='MinT'):
+    """
+    Reconcilia as previsões de todos os nós (linhas de S) numa única projeção linear S @ G.
+
+    'Bottom-up' usa apenas as séries base; 'MinT' usa as previsões de todos os níveis,
+    ponderadas pela covariância encolhida dos resíduos.
+    """
+    n_base = S.shape[1]
+    if metodo == 'Bottom-up':
+        G = np.hstack([np.zeros((n_base, S.shape[0] - n_base)), np.eye(n_base)])
+    elif metodo == 'MinT':
+        W_inv = np.linalg.pinv(_covariancia_encolhida(residuos))
+        G = np.linalg.pinv(S.T @ W_inv @ S) @ S.T @ W_inv
+    else:
+        raise ValueError(f"Método de reconciliação desconhecido: {metodo}")
+    return S @ G @ previsoes_base
+
+
+def prever_hierarquico(df, nivel='Turno', metodo='MinT', passos=HORIZONTE, p=ORDEM_ARIMA[0]):
+    """
+    Previsão reconciliada Total/Turno(/Hora) a partir de um DataFrame diário no formato longo.
+
+    `df` deve conter Data, Quantidade de Pacientes e as colunas do nível escolhido
+    (ver NIVEIS_HIERARQUIA). Retorna o formato longo (Nível, Data, Previsão).
+    """
+    base = df.pivot_table(
+        index='Data', columns=NIVEIS_HIERARQUIA[nivel], values='Quantidade de Pacientes',
+        aggfunc='sum', fill_value=0, observed=True
+    ).sort_index()
+    S, rotulos = matriz_soma(base.columns)
+
+    # Todos os nós da hierarquia ajustados em um único lote
+    Y = S @ base.to_numpy(dtype=float).T
+    coeficientes, residuos = ajustar_ar_em_lote(Y, p=p)
+    previsoes_base = prever_ar_em_lote(Y, coeficientes, passos=passos)
+    reconciliadas = reconciliar(S, previsoes_base, residuos, metodo=metodo)
+
+    # As datas futuras começam no dia seguinte ao último observado, como em prever_serie
+    datas = pd.date_range(start=base.index[-1] + pd.Timedelta(days=1), periods=passos, freq='D')
+    return pd.DataFrame({
+        'Nível': np.repeat(rotulos, passos),
+        'Data': np.tile(datas, len(rotulos)),
+        'Previsão': reconciliadas.ravel(),
+    })
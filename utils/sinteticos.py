@@ -0,0 +1,122 @@
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+# ===============================
+# Geração de dados sintéticos
+# ===============================
+# Conjuntos no mesmo formato dos templates em dataset/, em qualquer escala,
+# usados nos benchmarks e para testar a aplicação com várias unidades.
+# As colunas de texto são geradas como categorias para caberem em memória
+# mesmo com dezenas de milhões de linhas.
+
+# Tempo de ciclo médio (minutos) de cada etapa
+ETAPAS_PADRAO = {
+    'Recepção': 20,
+    'Triagem': 20,
+    '1º Atendimento médico': 18,
+}
+
+# Turno de cada hora do dia (0h-5h: 4, 6h-11h: 1, 12h-17h: 2, 18h-23h: 3)
+TURNO_POR_HORA = np.array([4] * 6 + [1] * 6 + [2] * 6 + [3] * 6)
+HORAS = np.array([f'{h:02d}:00' for h in range(24)])
+
+LIMITE_EXCEL = 1_048_575  # Linhas de dados por planilha (sem o cabeçalho)
+DIAS_MAXIMOS = 1096  # Cerca de 3 anos de histórico horário por unidade
+
+
+def _nomes_unidades(unidades):
+    return [f'Unidade {i + 1:03d}' for i in range(unidades)]
+
+
+def unidades_necessarias(linhas):
+    """Menor quantidade de unidades para gerar `linhas` chegadas horárias sem passar de DIAS_MAXIMOS dias."""
+    return max(1, math.ceil(linhas / (24 * DIAS_MAXIMOS)))
+
+
+def gerar_pacientes_hora(linhas, unidades=1, inicio='2024-09-02', media=19, semente=0):
+    """
+    Gera chegadas horárias (Data, Hora, Quantidade de Pacientes, Turno) com cerca de `linhas` linhas.
+
+    As linhas são divididas em dias completos por unidade, com no máximo DIAS_MAXIMOS dias;
+    volumes maiores exigem mais unidades (ver unidades_necessarias). A quantidade segue uma
+    Poisson com perfil ao longo do dia, sazonalidade semanal e porte diferente para cada unidade.
+    Com mais de uma unidade, a coluna 'Unidade' é incluída.
+    """
+    rng = np.random.default_rng(semente)
+    dias = max(1, math.ceil(linhas / (24 * unidades)))
+    if dias > DIAS_MAXIMOS:
+        raise ValueError(
+            f"{linhas} linhas com {unidades} unidade(s) exigiriam {dias} dias de histórico por unidade "
+            f"(máximo {DIAS_MAXIMOS}). Use ao menos {unidades_necessarias(linhas)} unidades."
+        )
+
+    datas = pd.date_range(inicio, periods=dias, freq='D')
+    idx_unidade = np.repeat(np.arange(unidades), dias * 24)
+    idx_dia = np.tile(np.repeat(np.arange(dias), 24), unidades)
+    hora = np.tile(np.arange(24), dias * unidades)
+
+    perfil_hora = 1 + 0.35 * np.sin((hora - 9) / 24 * 2 * np.pi)
+    perfil_semana = np.where(datas.dayofweek.to_numpy()[idx_dia] >= 5, 0.85, 1.05)
+    porte = rng.uniform(0.6, 1.4, size=unidades)[idx_unidade]
+    quantidade = rng.poisson(media * perfil_hora * perfil_semana * porte)
+
+    df = pd.DataFrame({
+        'Data': datas.to_numpy()[idx_dia],
+        'Hora': pd.Categorical.from_codes(hora, HORAS),
+        'Quantidade de Pacientes': quantidade,
+        'Turno': TURNO_POR_HORA[hora],
+    })
+    if unidades > 1:
+        df['Unidade'] = pd.Categorical.from_codes(idx_unidade, _nomes_unidades(unidades))
+    return df
+
+
+def gerar_tempo_ciclo(linhas, unidades=1, dias=30, inicio='2024-09-02', etapas=None, semente=0):
+    """
+    Gera medições de tempo de ciclo (ID, Etapa, Data, Tempo (Minutos), Turno) com `linhas` linhas.
+
+    O tempo de cada etapa segue uma Gamma com a média informada em `etapas`
+    (padrão ETAPAS_PADRAO), arredondada para minutos inteiros de no mínimo 1.
+    """
+    rng = np.random.default_rng(semente)
+    etapas = etapas or ETAPAS_PADRAO
+    nomes = np.array(list(etapas))
+    medias = np.array(list(etapas.values()), dtype=float)
+
+    idx_etapa = rng.integers(0, len(nomes), size=linhas)
+    tempo = rng.gamma(shape=4.0, scale=medias[idx_etapa] / 4.0)
+
+    df = pd.DataFrame({
+        'ID': rng.integers(1000, 10000, size=linhas),
+        'Etapa': pd.Categorical.from_codes(idx_etapa, nomes),
+        'Data': pd.Timestamp(inicio) + pd.to_timedelta(rng.integers(0, dias, size=linhas), unit='D'),
+        'Tempo (Minutos)': np.maximum(1, np.round(tempo)).astype(int),
+        'Turno': pd.Categorical.from_codes(rng.integers(0, 4, size=linhas), [f'Turno {t}' for t in range(1, 5)]),
+    })
+    if unidades > 1:
+        df['Unidade'] = pd.Categorical.from_codes(rng.integers(0, unidades, size=linhas), _nomes_unidades(unidades))
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera planilhas sintéticas no formato dos templates.")
+    parser.add_argument('--linhas', type=int, default=10_000, help="Linhas de cada arquivo")
+    parser.add_argument('--unidades', type=int, default=1, help="Quantidade de unidades")
+    parser.add_argument('--saida', default='dataset_sintetico', help="Pasta de saída")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+    if args.linhas > LIMITE_EXCEL:
+        parser.error(f"O Excel comporta no máximo {LIMITE_EXCEL} linhas por planilha.")
+    if args.unidades < unidades_necessarias(args.linhas):
+        parser.error(f"Para {args.linhas} linhas use ao menos {unidades_necessarias(args.linhas)} unidades.")
+
+    os.makedirs(args.saida, exist_ok=True)
+    pacientes = gerar_pacientes_hora(args.linhas, args.unidades, semente=args.semente)
+    tempo_ciclo = gerar_tempo_ciclo(args.linhas, args.unidades, semente=args.semente)
+    pacientes.to_excel(os.path.join(args.saida, 'sintetico_pacientes_hora.xlsx'), index=False)
+    tempo_ciclo.to_excel(os.path.join(args.saida, 'sintetico_tempo_ciclo.xlsx'), index=False)
+    print(f"Arquivos gravados em {args.saida}/")